@@ -20,7 +20,7 @@ from datetime import datetime
 
 from dotenv import load_dotenv
 
-from src.firehose import FirehoseListener
+from src.firehose import FirehoseListener, RepostEvent
 from src.url_extractor import URLExtractor
 from src.domain_filter import DomainFilter
 from src.database import Database
@@ -182,13 +182,7 @@ class FeedGenerator:
             logger.error(f"Error handling post {uri}: {e}", exc_info=True)
             return None
     
-    async def _handle_repost(
-        self,
-        repost_uri: str,
-        original_post_uri: str,
-        author_did: str,
-        timestamp: str,
-    ) -> bool:
+    async def _handle_repost(self, event: RepostEvent) -> bool:
         """
         Handle a repost event from the firehose.
         
@@ -196,14 +190,14 @@ class FeedGenerator:
         It increments the repost count for the original post if we're tracking it.
         
         Args:
-            repost_uri: AT Protocol URI of the repost itself
-            original_post_uri: AT Protocol URI of the original post being reposted
-            author_did: DID of the user who reposted
-            timestamp: Timestamp of the repost
+            event: Repost details (repost URI, original post URI, reposting
+                   author DID and timestamp)
             
         Returns:
             True if the original post is tracked and repost count was incremented, False otherwise
         """
+        original_post_uri = event.original_post_uri
+        
         try:
             # Try to increment the repost count for the original post
             # This will only succeed if we're tracking that post (it has a whitelisted URL)
@@ -217,7 +211,7 @@ class FeedGenerator:
             return success
                 
         except Exception as e:
-            logger.error(f"Error handling repost {repost_uri}: {e}", exc_info=True)
+            logger.error(f"Error handling repost {event.repost_uri}: {e}", exc_info=True)
             return False
     
     async def run_firehose(self):
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the ranking score calculation.
+
+Times scoring a batch of synthetic posts one at a time with
+RankingEngine.calculate_score against scoring them in one call with
+RankingEngine.calculate_scores. Run it before and after changing the
+scoring code to catch regressions.
+
+Usage:
+    python scripts/benchmark_scores.py [options]
+
+Examples:
+    # Score 10,000 posts with the default config
+    python scripts/benchmark_scores.py
+
+    # Score 100,000 posts with a specific config, best of 10 runs
+    python scripts/benchmark_scores.py --rows 100000 --repeat 10 --config config/ranking.json
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ranking import RankingEngine, RankingConfig
+
+
+def make_rows(rows: int, max_age_hours: float, seed: int):
+    """Generate synthetic (share_counts, url_ages_hours, repost_counts) columns."""
+    rng = random.Random(seed)
+    share_counts = [rng.randint(1, 500) for _ in range(rows)]
+    url_ages_hours = [rng.uniform(0, max_age_hours) for _ in range(rows)]
+    repost_counts = [rng.randint(0, 50) for _ in range(rows)]
+    return share_counts, url_ages_hours, repost_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ranking score calculation",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=10000,
+        help="Number of synthetic posts to score (default: 10000)"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs, the best is reported (default: 5)"
+    )
+
+    parser.add_argument(
+        "--config",
+        help="Path to ranking config (default: built-in defaults)"
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for the synthetic posts (default: 0)"
+    )
+
+    args = parser.parse_args()
+
+    config = RankingConfig.from_file(args.config) if args.config else RankingConfig()
+
+    # Scoring never touches the database, so the engine doesn't need one
+    engine = RankingEngine(None, config)
+
+    share_counts, url_ages_hours, repost_counts = make_rows(
+        args.rows, config.max_age_hours, args.seed
+    )
+
+    def score_each():
+        return [
+            engine.calculate_score(share_count, url_age_hours, repost_count)
+            for share_count, url_age_hours, repost_count
+            in zip(share_counts, url_ages_hours, repost_counts)
+        ]
+
+    def score_batch():
+        return engine.calculate_scores(share_counts, url_ages_hours, repost_counts)
+
+    # Both paths must agree before their timings mean anything
+    if score_each() != score_batch():
+        print("calculate_score and calculate_scores disagree")
+        sys.exit(1)
+
+    print(f"Scoring {args.rows:,} posts (best of {args.repeat} runs)")
+    print(f"Config: {config.to_dict()}")
+
+    results = {}
+    for name, func in (("calculate_score", score_each), ("calculate_scores", score_batch)):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        results[name] = best
+        per_post_ns = best / args.rows * 1e9
+        print(f"  {name:<18} {best * 1000:8.2f} ms  ({per_post_ns:6.1f} ns/post)")
+
+    speedup = results["calculate_score"] / results["calculate_scores"]
+    print(f"  Batch speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Config Loader - Read JSON config files, reusing the parse while they're unchanged"""
+
+import functools
+import json
+from typing import Any, Dict
+
+try:
+    # orjson is optional; its JSONDecodeError subclasses json.JSONDecodeError
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+@functools.lru_cache(maxsize=32)
+def read_json_config(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Read and parse a JSON config file.
+    
+    Results are cached on the file's modification time and size, so
+    constructing components or reloading an unchanged file skips the parse.
+    The returned dict is shared between callers and must not be modified.
+    
+    Args:
+        path: Path to the config file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
+    
+    Returns:
+        Parsed config dictionary
+    
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    # Parse the raw bytes directly rather than going through a text wrapper
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
@@ -11,7 +11,7 @@ It manages three tables:
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, Iterable, List, Dict, Any, Tuple
 
 from sqlalchemy import (
     create_engine,
@@ -24,6 +24,7 @@ from sqlalchemy import (
     Index,
     func,
     event,
+    literal,
     text,
 )
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
@@ -54,6 +55,7 @@ class Post(Base):
     # Index for performance
     __table_args__ = (
         Index("idx_posts_repost_count", "repost_count"),
+        Index("idx_posts_created_at", "created_at"),
     )
     
     def __repr__(self):
@@ -97,15 +99,31 @@ class PostURL(Base):
     post = relationship("Post", back_populates="post_urls")
     url = relationship("URL", back_populates="post_urls")
     
-    # Index for time-based queries
+    # Indexes for time-based queries and URL lookups
     __table_args__ = (
         Index("idx_shared_at", "shared_at"),
+        Index("idx_post_urls_url_id", "url_id"),
     )
     
     def __repr__(self):
         return f"<PostURL(post={self.post_uri}, url_id={self.url_id})>"
 
 
+def _url_age_hours(now: datetime):
+    """
+    SQL expression for the age of a URL in hours, based on when it was first seen.
+    
+    Args:
+        now: Time to measure the age at
+    
+    Returns:
+        Labelled column expression named url_age_hours
+    """
+    return (
+        (func.julianday(literal(now, DateTime)) - func.julianday(URL.first_seen)) * 24.0
+    ).label("url_age_hours")
+
+
 class Database:
     """
     Async database manager for the feed generator.
@@ -117,14 +135,19 @@ class Database:
     - Querying posts for feed generation
     """
     
-    def __init__(self, db_path: str = "data/feed.db"):
+    def __init__(self, db_path: str = "data/feed.db", fast_mode: bool = False):
         """
         Initialize database connection.
         
         Args:
             db_path: Path to SQLite database file
+            fast_mode: Skip fsyncs and keep the journal in memory. Much faster
+                      for writes, but the database can be corrupted if the
+                      process crashes, so only use it for throwaway databases
+                      such as in tests.
         """
         self.db_path = db_path
+        self.fast_mode = fast_mode
         
         # Ensure data directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -140,8 +163,12 @@ class Database:
         def set_sqlite_pragma(dbapi_conn, connection_record):
             cursor = dbapi_conn.cursor()
             cursor.execute("PRAGMA foreign_keys=ON")
-            cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
-            cursor.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL, still safe
+            if fast_mode:
+                cursor.execute("PRAGMA journal_mode=MEMORY")  # No journal file on disk
+                cursor.execute("PRAGMA synchronous=OFF")  # Never wait for fsync
+            else:
+                cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
+                cursor.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL, still safe
             cursor.execute("PRAGMA cache_size=-64000")  # 64MB cache
             cursor.execute("PRAGMA temp_store=MEMORY")  # Store temp tables in memory
             cursor.close()
@@ -163,8 +190,21 @@ class Database:
         async with self.engine.begin() as conn:
             await conn.execute(text("PRAGMA foreign_keys = ON"))
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(self._create_missing_indexes)
         logger.info("Database schema created")
     
+    @staticmethod
+    def _create_missing_indexes(conn):
+        """
+        Create any model indexes that an existing database doesn't have yet.
+        
+        create_all only builds indexes along with the tables it creates, so
+        indexes added to a model later would never reach an older database.
+        """
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    
     async def close(self):
         """Close database connection."""
         await self.engine.dispose()
@@ -285,6 +325,8 @@ class Database:
         
         This is much more efficient than adding posts one at a time,
         as it reduces database round-trips and transaction overhead.
+        URLs, posts and links are each written with a single executemany
+        rather than one statement per post.
         
         Args:
             posts: List of post dictionaries, each containing:
@@ -302,47 +344,91 @@ class Database:
         if not posts:
             return 0
         
-        added_count = 0
+        from sqlalchemy import insert, select, update
         
         async with self.async_session() as session:
             try:
-                # Process each post in the batch
+                # Skip posts that are already stored, or repeated within the
+                # batch, up front so a duplicate doesn't abort the whole batch
+                batch_uris = {post_data['uri'] for post_data in posts}
+                result = await session.execute(
+                    select(Post.uri).where(Post.uri.in_(batch_uris))
+                )
+                seen_uris = set(result.scalars())
+                
+                new_posts = []
                 for post_data in posts:
-                    try:
-                        # Check if URL exists, create or update
-                        url_record = await self._get_or_create_url(
-                            session,
-                            post_data['url'],
-                            post_data['domain']
-                        )
-                        
-                        # Create post record
-                        post = Post(
-                            uri=post_data['uri'],
-                            cid=post_data['cid'],
-                            author_did=post_data['author_did'],
-                            text=post_data.get('text'),
-                            created_at=post_data['created_at'],
-                        )
-                        session.add(post)
-                        
-                        # Create junction table entry
-                        post_url = PostURL(
-                            post_uri=post_data['uri'],
-                            url_id=url_record.id,
-                        )
-                        session.add(post_url)
-                        
-                        added_count += 1
-                        
-                    except IntegrityError:
-                        # Post already exists, skip it
-                        await session.rollback()
+                    if post_data['uri'] in seen_uris:
                         logger.debug(f"Post {post_data['uri']} already exists, skipping")
                         continue
+                    seen_uris.add(post_data['uri'])
+                    new_posts.append(post_data)
+                
+                if not new_posts:
+                    return 0
+                
+                # Count the new shares for each URL in the batch
+                url_shares: Dict[str, int] = {}
+                url_domains: Dict[str, str] = {}
+                for post_data in new_posts:
+                    url = post_data['url']
+                    url_shares[url] = url_shares.get(url, 0) + 1
+                    url_domains.setdefault(url, post_data['domain'])
+                
+                # Bump share counts for URLs we already know about...
+                result = await session.execute(
+                    select(URL.id, URL.url, URL.share_count).where(URL.url.in_(url_shares))
+                )
+                url_ids = {}
+                share_updates = []
+                for url_id, url, share_count in result.all():
+                    url_ids[url] = url_id
+                    share_updates.append(
+                        {"id": url_id, "share_count": share_count + url_shares[url]}
+                    )
+                if share_updates:
+                    await session.execute(update(URL), share_updates)
+                
+                # ...and create the rest
+                new_urls = [
+                    {"url": url, "domain": url_domains[url], "share_count": count}
+                    for url, count in url_shares.items()
+                    if url not in url_ids
+                ]
+                if new_urls:
+                    await session.execute(insert(URL), new_urls)
+                    result = await session.execute(
+                        select(URL.id, URL.url).where(
+                            URL.url.in_([row["url"] for row in new_urls])
+                        )
+                    )
+                    url_ids.update((url, url_id) for url_id, url in result.all())
+                
+                # Insert the posts and their URL links with one executemany each
+                await session.execute(
+                    insert(Post),
+                    [
+                        {
+                            "uri": post_data['uri'],
+                            "cid": post_data['cid'],
+                            "author_did": post_data['author_did'],
+                            "text": post_data.get('text'),
+                            "created_at": post_data['created_at'],
+                        }
+                        for post_data in new_posts
+                    ],
+                )
+                await session.execute(
+                    insert(PostURL),
+                    [
+                        {"post_uri": post_data['uri'], "url_id": url_ids[post_data['url']]}
+                        for post_data in new_posts
+                    ],
+                )
                 
                 # Commit all posts in one transaction
                 await session.commit()
+                added_count = len(new_posts)
                 logger.debug(f"Batch added {added_count} posts out of {len(posts)}")
                 return added_count
                 
@@ -350,6 +436,38 @@ class Database:
                 await session.rollback()
                 logger.error(f"Error in batch add: {e}", exc_info=True)
                 raise
+
+    async def add_posts_bulk(
+        self,
+        rows: Iterable[Tuple[str, str, str, str, str, datetime]],
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Add posts from plain tuples, in chunks of batch transactions.
+        
+        Each chunk is written with add_posts_batch, so a large load takes one
+        transaction per chunk_size posts and keeps the URI and URL lookups
+        well under SQLite's bound parameter limit.
+        
+        Args:
+            rows: Iterable of (uri, cid, author_did, url, domain, created_at)
+                  tuples
+            chunk_size: Maximum number of posts written per transaction
+        
+        Returns:
+            Number of posts successfully added (excludes duplicates)
+        """
+        keys = ("uri", "cid", "author_did", "url", "domain", "created_at")
+        added_count = 0
+        chunk = []
+        for row in rows:
+            chunk.append(dict(zip(keys, row)))
+            if len(chunk) >= chunk_size:
+                added_count += await self.add_posts_batch(chunk)
+                chunk = []
+        if chunk:
+            added_count += await self.add_posts_batch(chunk)
+        return added_count
     
     async def increment_repost_count(self, post_uri: str) -> bool:
         """
@@ -378,6 +496,98 @@ class Database:
                 logger.debug(f"Post {post_uri} not found for repost increment")
                 return False
     
+    async def set_repost_count(self, post_uri: str, repost_count: int) -> bool:
+        """
+        Set the repost count for a post directly.
+        
+        This is a single UPDATE, so it's cheaper than calling
+        increment_repost_count repeatedly when the count is already known.
+        
+        Args:
+            post_uri: AT Protocol URI of the post
+            repost_count: New repost count
+        
+        Returns:
+            True if post exists and was updated, False if post not found
+        """
+        from sqlalchemy import update
+        
+        async with self.async_session() as session:
+            result = await session.execute(
+                update(Post)
+                .where(Post.uri == post_uri)
+                .values(repost_count=repost_count)
+            )
+            await session.commit()
+            
+            if result.rowcount:
+                logger.debug(f"Set repost count for {post_uri} to {repost_count}")
+                return True
+            else:
+                logger.debug(f"Post {post_uri} not found for repost count update")
+                return False
+
+    async def seed_url(
+        self,
+        url: str,
+        domain: str,
+        share_count: int,
+        first_seen: datetime,
+        uri: Optional[str] = None,
+    ) -> str:
+        """
+        Insert a URL with a given share count and a single post linking to it.
+        
+        This writes the URL's share count and first seen time directly
+        instead of adding one post per share, which makes it a cheap way to
+        set up test data or backfill URLs.
+        
+        Args:
+            url: Normalized URL
+            domain: Domain extracted from URL
+            share_count: Share count to store for the URL
+            first_seen: When the URL was first seen, also used as the post's
+                       creation time
+            uri: AT Protocol URI of the post (generated from the URL id if None)
+        
+        Returns:
+            URI of the inserted post
+        """
+        async with self.async_session() as session:
+            try:
+                url_record = URL(
+                    url=url,
+                    domain=domain,
+                    first_seen=first_seen,
+                    share_count=share_count,
+                )
+                session.add(url_record)
+                await session.flush()  # Ensure ID is generated
+                
+                if uri is None:
+                    uri = f"at://did:plc:seed/app.bsky.feed.post/{url_record.id}"
+                
+                session.add(Post(
+                    uri=uri,
+                    cid=f"seed{url_record.id}",
+                    author_did="did:plc:seed",
+                    created_at=first_seen,
+                ))
+                session.add(PostURL(
+                    post_uri=uri,
+                    url_id=url_record.id,
+                    shared_at=first_seen,
+                ))
+                
+                await session.commit()
+                logger.debug(f"Seeded URL {url} with {share_count} shares")
+                return uri
+            
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error seeding URL {url}: {e}")
+                raise
+    
     async def get_post(self, uri: str) -> Optional[Dict[str, Any]]:
         """
         Get a post by URI.
@@ -449,11 +659,42 @@ class Database:
         url_data = await self.get_url(url)
         return url_data["share_count"] if url_data else 0
     
+    @staticmethod
+    def _post_columns(now: Optional[datetime]) -> list:
+        """Columns to select for post queries, adding URL age when now is given."""
+        columns = [Post, URL, PostURL]
+        if now is not None:
+            columns.append(_url_age_hours(now))
+        return columns
+    
+    @staticmethod
+    def _post_row_to_dict(row) -> Dict[str, Any]:
+        """Convert a row selected with _post_columns to a post dictionary."""
+        post, url, post_url = row[0], row[1], row[2]
+        post_dict = {
+            "uri": post.uri,
+            "cid": post.cid,
+            "author_did": post.author_did,
+            "text": post.text,
+            "created_at": post.created_at,
+            "indexed_at": post.indexed_at,
+            "url": url.url,
+            "domain": url.domain,
+            "share_count": url.share_count,
+            "shared_at": post_url.shared_at,
+            "repost_count": post.repost_count,
+            "url_first_seen": url.first_seen,
+        }
+        if len(row) > 3:
+            post_dict["url_age_hours"] = row[3]
+        return post_dict
+    
     async def get_posts_by_domain(
         self,
         domain: str,
         limit: int = 50,
         offset: int = 0,
+        now: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get posts containing URLs from a specific domain.
@@ -462,6 +703,8 @@ class Database:
             domain: Domain to filter by
             limit: Maximum number of posts to return
             offset: Number of posts to skip
+            now: If given, also compute each URL's age in hours at this time
+                 (returned as url_age_hours)
         
         Returns:
             List of post dictionaries with URL information
@@ -470,7 +713,7 @@ class Database:
         
         async with self.async_session() as session:
             query = (
-                select(Post, URL, PostURL)
+                select(*self._post_columns(now))
                 .join(PostURL, Post.uri == PostURL.post_uri)
                 .join(URL, PostURL.url_id == URL.id)
                 .where(URL.domain == domain)
@@ -482,29 +725,30 @@ class Database:
             result = await session.execute(query)
             rows = result.all()
             
-            posts = []
-            for post, url, post_url in rows:
-                posts.append({
-                    "uri": post.uri,
-                    "cid": post.cid,
-                    "author_did": post.author_did,
-                    "text": post.text,
-                    "created_at": post.created_at,
-                    "indexed_at": post.indexed_at,
-                    "url": url.url,
-                    "domain": url.domain,
-                    "share_count": url.share_count,
-                    "shared_at": post_url.shared_at,
-                    "repost_count": post.repost_count,
-                    "url_first_seen": url.first_seen,
-                })
-            
-            return posts
+            return [self._post_row_to_dict(row) for row in rows]
+    
+    @classmethod
+    def _recent_posts_query(cls, hours: int, limit: int, now: Optional[datetime]):
+        """Build the get_recent_posts query (see there for the arguments)."""
+        from sqlalchemy import select
+        from datetime import timedelta
+        
+        cutoff_time = (now or datetime.utcnow()) - timedelta(hours=hours)
+        
+        return (
+            select(*cls._post_columns(now))
+            .join(PostURL, Post.uri == PostURL.post_uri)
+            .join(URL, PostURL.url_id == URL.id)
+            .where(Post.created_at >= cutoff_time)
+            .order_by(Post.created_at.desc())
+            .limit(limit)
+        )
     
     async def get_recent_posts(
         self,
         hours: int = 168,
         limit: int = 50,
+        now: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get recent posts within specified time window.
@@ -512,46 +756,19 @@ class Database:
         Args:
             hours: Number of hours to look back
             limit: Maximum number of posts to return
+            now: If given, measure the window back from this time instead of
+                 the current time, and also compute each URL's age in hours at
+                 it (returned as url_age_hours)
         
         Returns:
             List of post dictionaries with URL information
         """
-        from sqlalchemy import select
-        from datetime import timedelta
-        
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        
         async with self.async_session() as session:
-            query = (
-                select(Post, URL, PostURL)
-                .join(PostURL, Post.uri == PostURL.post_uri)
-                .join(URL, PostURL.url_id == URL.id)
-                .where(Post.created_at >= cutoff_time)
-                .order_by(Post.created_at.desc())
-                .limit(limit)
-            )
-            
+            query = self._recent_posts_query(hours, limit, now)
             result = await session.execute(query)
             rows = result.all()
             
-            posts = []
-            for post, url, post_url in rows:
-                posts.append({
-                    "uri": post.uri,
-                    "cid": post.cid,
-                    "author_did": post.author_did,
-                    "text": post.text,
-                    "created_at": post.created_at,
-                    "indexed_at": post.indexed_at,
-                    "url": url.url,
-                    "domain": url.domain,
-                    "share_count": url.share_count,
-                    "shared_at": post_url.shared_at,
-                    "repost_count": post.repost_count,
-                    "url_first_seen": url.first_seen,
-                })
-            
-            return posts
+            return [self._post_row_to_dict(row) for row in rows]
     
     async def get_stats(self) -> Dict[str, int]:
         """
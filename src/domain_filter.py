@@ -2,11 +2,87 @@
 
 import json
 import logging
-from pathlib import Path
-from typing import Set, Optional
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Set, Optional
+
+from .config_loader import read_json_config
+from .url_extractor import extract_domain
 
 logger = logging.getLogger(__name__)
 
+# Key marking a trie node where a whitelisted domain ends. Domains checked here
+# come from untrusted posts and may hold any label, so the marker is a private
+# object that no string label can ever equal.
+_TERMINAL = object()
+
+
+def _build_trie(domains: Iterable[str]) -> Dict[str, Any]:
+    """
+    Build a trie of domains keyed by their labels in reverse order.
+    
+    For example "news.bbc.co.uk" is stored under uk -> co -> bbc -> news, so a
+    lookup walks from the top-level label down and a subdomain match is simply
+    reaching a terminal node before running out of labels.
+    
+    Args:
+        domains: Lowercased domain names
+        
+    Returns:
+        Root node of the trie
+    """
+    root: Dict[str, Any] = {}
+    for domain in domains:
+        _trie_insert(root, domain)
+    return root
+
+
+def _trie_insert(root: Dict[str, Any], domain: str):
+    """
+    Add a domain to a trie built by _build_trie.
+    
+    Args:
+        root: Root node of the trie
+        domain: Lowercased domain name
+    """
+    node = root
+    for label in reversed(domain.split('.')):
+        node = node.setdefault(label, {})
+    node[_TERMINAL] = True
+
+
+def _trie_remove(root: Dict[str, Any], domain: str) -> bool:
+    """
+    Remove a domain from a trie built by _build_trie, pruning empty branches.
+    
+    Args:
+        root: Root node of the trie
+        domain: Lowercased domain name
+        
+    Returns:
+        True if the domain was in the trie, False otherwise
+    """
+    # Walk down, remembering the path so empty nodes can be pruned afterwards
+    path = []
+    node = root
+    for label in reversed(domain.split('.')):
+        child = node.get(label)
+        if child is None:
+            return False
+        path.append((node, label))
+        node = child
+
+    if _TERMINAL not in node:
+        return False
+    del node[_TERMINAL]
+
+    # Prune nodes that no longer lead to any domain
+    for parent, label in reversed(path):
+        if parent[label]:
+            break
+        del parent[label]
+    return True
+
 
 class DomainFilter:
     """
@@ -16,50 +92,88 @@ class DomainFilter:
     checks whether URLs belong to approved domains.
     """
 
-    def __init__(self, config_path: str = "config/domains.json"):
+    def __init__(
+        self,
+        config_path: str = "config/domains.json",
+        config: Optional[Dict[str, Any]] = None,
+    ):
         """
         Initialize the domain filter.
         
         Args:
             config_path: Path to the domains configuration file
+            config: Configuration dictionary to use instead of reading
+                    config_path (same keys as the JSON file)
         """
         self.config_path = config_path
         self.domains: Set[str] = set()
         self.match_subdomains: bool = True
+        self._trie: Dict[str, Any] = {}
+        self._config = config
         self._load_config()
 
     def _load_config(self):
-        """Load domain whitelist from configuration file."""
+        """Load domain whitelist from the config dictionary or configuration file."""
+        if self._config is not None:
+            self._apply_config(self._config, "provided config")
+            return
+
         try:
-            config_file = Path(self.config_path)
-            
-            if not config_file.exists():
+            try:
+                stat = os.stat(self.config_path)
+            except FileNotFoundError:
                 logger.warning(f"Config file not found: {self.config_path}")
                 return
 
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-
-            # Load domains and convert to lowercase for case-insensitive matching
-            domains = config.get('domains', [])
-            self.domains = {domain.lower() for domain in domains}
-            
-            # Load subdomain matching setting
-            self.match_subdomains = config.get('match_subdomains', True)
-
-            logger.info(
-                f"Loaded {len(self.domains)} domains from {self.config_path}. "
-                f"Subdomain matching: {self.match_subdomains}"
-            )
-            logger.debug(f"Whitelisted domains: {sorted(self.domains)}")
+            config = read_json_config(str(self.config_path), stat.st_mtime_ns, stat.st_size)
+            self._apply_config(config, self.config_path)
 
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing config file {self.config_path}: {e}")
         except Exception as e:
             logger.error(f"Error loading config file {self.config_path}: {e}")
 
+    def _apply_config(self, config: Dict[str, Any], source: str):
+        """
+        Apply a parsed domain configuration.
+        
+        Args:
+            config: Configuration dictionary
+            source: Where the configuration came from (for logging)
+        """
+        # Load domains and convert to lowercase for case-insensitive matching.
+        # Interning lets them share the string objects (and cached hashes) of
+        # the interned domains URLExtractor.extract_domain hands us
+        domains = config.get('domains', [])
+        self.domains = {sys.intern(self._normalize(domain)) for domain in domains}
+        self._trie = _build_trie(self.domains)
+        
+        # Load subdomain matching setting
+        self.match_subdomains = config.get('match_subdomains', True)
+
+        logger.info(
+            f"Loaded {len(self.domains)} domains from {source}. "
+            f"Subdomain matching: {self.match_subdomains}"
+        )
+        logger.debug(f"Whitelisted domains: {sorted(self.domains)}")
+
+    @staticmethod
+    def _normalize(domain: str) -> str:
+        """Lowercase a domain and remove any www. prefix."""
+        # Domains from URLExtractor.extract_domain are already lowercase, so
+        # skip allocating a new string for them
+        if not domain.islower():
+            domain = domain.lower()
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        return domain
+
     def reload_config(self):
-        """Reload the domain whitelist from configuration file."""
+        """
+        Reload the domain whitelist from configuration file.
+        
+        Filters built from a config dictionary re-apply that dictionary.
+        """
         logger.info("Reloading domain configuration...")
         self._load_config()
 
@@ -76,38 +190,50 @@ class DomainFilter:
         if not domain:
             return False
 
-        # Normalize domain to lowercase
-        domain = domain.lower()
+        domain = self._normalize(domain)
 
-        # Remove www. prefix if present
-        if domain.startswith('www.'):
-            domain = domain[4:]
-
-        # Direct match
+        # Exact matches (the common case for allowed domains) are a single set
+        # lookup, so only fall back to the trie for subdomains
         if domain in self.domains:
             return True
 
-        # Subdomain matching if enabled
-        if self.match_subdomains:
-            # Check if domain is a subdomain of any whitelisted domain
-            # e.g., "mobile.nytimes.com" should match "nytimes.com"
-            for whitelisted_domain in self.domains:
-                if domain.endswith('.' + whitelisted_domain):
-                    return True
-
-        return False
+        # Walk the trie from the top-level label down. Reaching a terminal
+        # node means either an exact match (all labels consumed) or a
+        # subdomain of a whitelisted domain.
+        # e.g., "mobile.nytimes.com" should match "nytimes.com"
+        #
+        # Labels are sliced off one at a time from the right rather than
+        # splitting the whole domain up front. Most domains seen are not
+        # whitelisted and are rejected within the first one or two labels,
+        # so this avoids building the full label list for them.
+        node = self._trie
+        end = len(domain)
+        while True:
+            start = domain.rfind('.', 0, end) + 1
+            node = node.get(domain[start:end])
+            if node is None:
+                return False
+            if _TERMINAL in node and (start == 0 or self.match_subdomains):
+                return True
+            if start == 0:
+                return False
+            end = start - 1
 
-    def filter_url(self, url: str, domain: str) -> bool:
+    def filter_url(self, url: str, domain: Optional[str] = None) -> bool:
         """
         Check if a URL should be included based on its domain.
         
         Args:
             url: The full URL (for logging purposes)
-            domain: The extracted domain from the URL
+            domain: The extracted domain from the URL (taken from the URL
+                    itself if not provided)
             
         Returns:
             True if URL should be included, False otherwise
         """
+        if domain is None:
+            domain = extract_domain(url)
+
         allowed = self.is_allowed(domain)
         
         if allowed:
@@ -117,6 +243,44 @@ class DomainFilter:
         
         return allowed
 
+    def is_allowed_batch(self, domains: List[str]) -> List[bool]:
+        """
+        Check many domains against the whitelist at once.
+        
+        Batches from the firehose repeat the same few domains heavily, so
+        each distinct domain is only looked up once per call.
+        
+        Args:
+            domains: Domain names to check
+            
+        Returns:
+            List of booleans, True where the domain is whitelisted
+        """
+        is_allowed = self.is_allowed
+        seen: Dict[str, bool] = {}
+        results = []
+        for domain in domains:
+            allowed = seen.get(domain)
+            if allowed is None:
+                allowed = seen[domain] = is_allowed(domain)
+            results.append(allowed)
+        return results
+
+    def filter_url_batch(self, urls: List[str]) -> List[bool]:
+        """
+        Check many URLs against the whitelist at once.
+        
+        Unlike filter_url this takes the domain from each URL and skips
+        per-URL logging.
+        
+        Args:
+            urls: URLs to check
+            
+        Returns:
+            List of booleans, True where the URL's domain is whitelisted
+        """
+        return self.is_allowed_batch([extract_domain(url) for url in urls])
+
     def get_whitelisted_domains(self) -> Set[str]:
         """
         Get the set of whitelisted domains.
@@ -133,11 +297,10 @@ class DomainFilter:
         Args:
             domain: Domain to add
         """
-        domain = domain.lower()
-        if domain.startswith('www.'):
-            domain = domain[4:]
+        domain = sys.intern(self._normalize(domain))
         
         self.domains.add(domain)
+        _trie_insert(self._trie, domain)
         logger.info(f"Added domain to whitelist: {domain}")
 
     def remove_domain(self, domain: str):
@@ -147,18 +310,18 @@ class DomainFilter:
         Args:
             domain: Domain to remove
         """
-        domain = domain.lower()
-        if domain.startswith('www.'):
-            domain = domain[4:]
+        domain = self._normalize(domain)
         
         if domain in self.domains:
             self.domains.remove(domain)
+            _trie_remove(self._trie, domain)
             logger.info(f"Removed domain from whitelist: {domain}")
         else:
             logger.warning(f"Domain not in whitelist: {domain}")
 
     def __len__(self) -> int:
         """Return the number of whitelisted domains."""
+        # The set is kept in step with the trie, so this never walks the trie
         return len(self.domains)
 
     def __contains__(self, domain: str) -> bool:
@@ -2,8 +2,9 @@
 
 import asyncio
 import logging
+import re
 import time
-from typing import Callable, Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List, NamedTuple
 from datetime import datetime
 from collections import deque
 
@@ -18,6 +19,22 @@ from atproto import (
 
 logger = logging.getLogger(__name__)
 
+# Matches both http:// and https:// in a single pass over the post text
+_URL_PATTERN = re.compile(r'https?://')
+
+# Embed types that can carry an external link
+_EXTERNAL_EMBED = 'app.bsky.embed.external'
+_RECORD_WITH_MEDIA_EMBED = 'app.bsky.embed.recordWithMedia'
+
+
+class RepostEvent(NamedTuple):
+    """A repost seen on the firehose, passed to the repost callback."""
+
+    repost_uri: str
+    original_post_uri: str
+    author_did: str
+    timestamp: str
+
 
 class FirehoseListener:
     """
@@ -35,6 +52,8 @@ class FirehoseListener:
         firehose_url: str = "wss://bsky.network",
         batch_size: int = 100,
         flush_interval: float = 5.0,
+        num_post_workers: int = 4,
+        post_queue_size: int = 1024,
     ):
         """
         Initialize the Firehose Listener.
@@ -43,10 +62,13 @@ class FirehoseListener:
             on_post_callback: Async function to call when a new post is received.
                              Should accept (uri, cid, author_did, record, timestamp)
             on_repost_callback: Optional async function to call when a repost is received.
-                               Should accept (repost_uri, original_post_uri, author_did, timestamp)
+                               Should accept a single RepostEvent
             firehose_url: WebSocket URL for the Bluesky firehose
             batch_size: Number of posts to accumulate before flushing to database
             flush_interval: Seconds between automatic flushes
+            num_post_workers: Number of worker tasks passing queued posts to on_post_callback
+            post_queue_size: Maximum posts waiting for a worker before message
+                             processing blocks
         """
         self.on_post_callback = on_post_callback
         self.on_repost_callback = on_repost_callback
@@ -82,6 +104,11 @@ class FirehoseListener:
         self._batch_lock = asyncio.Lock()
         self._flush_task: Optional[asyncio.Task] = None
         
+        # Post dispatch queue, drained by a pool of worker tasks while running
+        self._num_post_workers = num_post_workers
+        self._post_queue: asyncio.Queue = asyncio.Queue(maxsize=post_queue_size)
+        self._post_workers: List[asyncio.Task] = []
+        
         # Tracking for periodic logging
         self._last_log_time = time.time()
         self._last_log_posts = 0
@@ -104,6 +131,7 @@ class FirehoseListener:
 
         # Start periodic flush task once
         self._flush_task = asyncio.create_task(self._periodic_flush())
+        self._start_post_workers()
         
         try:
             # Keep reconnecting until explicitly stopped
@@ -153,6 +181,9 @@ class FirehoseListener:
         finally:
             self._running = False
             
+            # Let the workers finish any queued posts
+            await self._stop_post_workers()
+            
             # Cancel flush task
             if self._flush_task:
                 self._flush_task.cancel()
@@ -274,6 +305,12 @@ class FirehoseListener:
             
             logger.debug(f"Processing commit with {len(commit.ops)} operations")
 
+            # These are shared by every operation in the commit, so look them
+            # up once rather than per op
+            repo = commit.repo
+            commit_time = commit.time
+            blocks = car.blocks
+
             # Process each operation in the commit
             for op in commit.ops:
                 # We only care about creates (new posts and reposts)
@@ -287,7 +324,7 @@ class FirehoseListener:
                         continue
                     
                     try:
-                        record = car.blocks.get(op.cid)
+                        record = blocks.get(op.cid)
                         if record is None:
                             continue
                     except (UnicodeDecodeError, ValueError, KeyError) as e:
@@ -297,16 +334,16 @@ class FirehoseListener:
 
                     # Extract post information
                     uri = AtUri.from_str(
-                        f"at://{commit.repo}/{op.path}"
+                        f"at://{repo}/{op.path}"
                     )
                     
                     # Call the callback with post data
                     await self._handle_post(
                         uri=str(uri),
                         cid=str(op.cid),
-                        author_did=commit.repo,
+                        author_did=repo,
                         record=record,
-                        timestamp=commit.time,
+                        timestamp=commit_time,
                     )
                     
                     self._posts_processed += 1
@@ -321,7 +358,7 @@ class FirehoseListener:
                         continue
                     
                     try:
-                        record = car.blocks.get(op.cid)
+                        record = blocks.get(op.cid)
                         if record is None:
                             continue
                     except (UnicodeDecodeError, ValueError, KeyError) as e:
@@ -331,15 +368,15 @@ class FirehoseListener:
 
                     # Extract repost information
                     uri = AtUri.from_str(
-                        f"at://{commit.repo}/{op.path}"
+                        f"at://{repo}/{op.path}"
                     )
                     
                     # Call the repost handler
                     await self._handle_repost(
                         repost_uri=str(uri),
-                        author_did=commit.repo,
+                        author_did=repo,
                         record=record,
-                        timestamp=commit.time,
+                        timestamp=commit_time,
                     )
                     
                     self._reposts_processed += 1
@@ -368,9 +405,6 @@ class FirehoseListener:
             timestamp: Timestamp of the post
         """
         try:
-            # Extract text and other relevant fields from record
-            text = record.get('text', '')
-            
             # Check if post has any links (either in text or embeds)
             has_links = self._has_links(record)
             
@@ -381,32 +415,95 @@ class FirehoseListener:
             # Track posts with links
             self._posts_with_links += 1
 
-            # Call the callback function (which will filter by whitelist and return post data)
-            # The callback should return post data dict if accepted, None otherwise
-            post_data = await self.on_post_callback(
-                uri=uri,
-                cid=cid,
-                author_did=author_did,
-                record=record,
-                timestamp=timestamp,
-            )
-            
-            # If post was accepted (has whitelisted links), add to batch
-            if post_data:
-                self._posts_with_whitelisted_links += 1
-                
-                # Add to batch queue
-                async with self._batch_lock:
-                    self._post_batch.append(post_data)
-                    
-                    # If batch is full, flush it
-                    if len(self._post_batch) >= self._batch_size:
-                        await self._flush_batch()
+            # Hand off to the worker pool when it's running, otherwise
+            # (e.g. when called directly) dispatch inline
+            if self._post_workers:
+                await self._post_queue.put((uri, cid, author_did, record, timestamp))
+            else:
+                await self._dispatch_post(uri, cid, author_did, record, timestamp)
 
         except Exception as e:
             logger.error(f"Error handling post {uri}: {e}", exc_info=True)
             raise
 
+    async def _dispatch_post(
+        self,
+        uri: str,
+        cid: str,
+        author_did: str,
+        record: dict,
+        timestamp: str,
+    ):
+        """
+        Pass a post with links to the callback and batch it if accepted.
+        
+        Args:
+            uri: AT Protocol URI of the post
+            cid: Content ID of the post
+            author_did: DID of the post author
+            record: Post record data
+            timestamp: Timestamp of the post
+        """
+        # Call the callback function (which will filter by whitelist and return post data)
+        # The callback should return post data dict if accepted, None otherwise
+        post_data = await self.on_post_callback(
+            uri=uri,
+            cid=cid,
+            author_did=author_did,
+            record=record,
+            timestamp=timestamp,
+        )
+        
+        # If post was accepted (has whitelisted links), add to batch
+        if post_data:
+            self._posts_with_whitelisted_links += 1
+            
+            # Add to batch queue
+            async with self._batch_lock:
+                self._post_batch.append(post_data)
+                
+                # If batch is full, flush it
+                if len(self._post_batch) >= self._batch_size:
+                    await self._flush_batch()
+
+    async def _post_worker(self):
+        """Take posts off the dispatch queue and pass them to the callback."""
+        while True:
+            post = await self._post_queue.get()
+            try:
+                await self._dispatch_post(*post)
+            except Exception as e:
+                self._errors += 1
+                logger.error(f"Error dispatching post {post[0]}: {e}", exc_info=True)
+            finally:
+                self._post_queue.task_done()
+
+    def _start_post_workers(self):
+        """Start the worker tasks that drain the post dispatch queue."""
+        if self._post_workers:
+            return
+        
+        self._post_workers = [
+            asyncio.create_task(self._post_worker())
+            for _ in range(self._num_post_workers)
+        ]
+
+    async def _stop_post_workers(self):
+        """Wait for queued posts to be dispatched, then stop the workers."""
+        if not self._post_workers:
+            return
+        
+        # Clear the worker list first so posts still being handled by
+        # in-flight message tasks dispatch inline rather than being queued
+        # for workers that are about to go away
+        workers, self._post_workers = self._post_workers, []
+        
+        await self._post_queue.join()
+        
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
     async def _handle_repost(
         self,
         repost_uri: str,
@@ -426,33 +523,35 @@ class FirehoseListener:
             record: Repost record data
             timestamp: Timestamp of the repost
         """
+        # Nothing to do with the repost if no one is listening for it
+        on_repost_callback = self.on_repost_callback
+        if not on_repost_callback:
+            return
+
         try:
-            # Extract the subject (original post) URI from the repost record
+            # Extract the subject (original post) URI from the repost record.
+            # These run for every repost on the network, so debug messages use
+            # lazy formatting rather than f-strings.
             subject = record.get('subject')
             if not subject:
-                logger.debug(f"Repost {repost_uri} has no subject")
+                logger.debug("Repost %s has no subject", repost_uri)
                 return
             
             original_post_uri = subject.get('uri')
             if not original_post_uri:
-                logger.debug(f"Repost {repost_uri} subject has no URI")
+                logger.debug("Repost %s subject has no URI", repost_uri)
                 return
             
-            logger.debug(f"Repost detected: {repost_uri} -> {original_post_uri}")
+            logger.debug("Repost detected: %s -> %s", repost_uri, original_post_uri)
             
-            # Call the repost callback if registered
-            if self.on_repost_callback:
-                result = await self.on_repost_callback(
-                    repost_uri=repost_uri,
-                    original_post_uri=original_post_uri,
-                    author_did=author_did,
-                    timestamp=timestamp,
-                )
-                
-                # Track if the repost was for a post we're tracking
-                if result:
-                    self._reposts_tracked += 1
-                    logger.debug(f"Tracked repost for {original_post_uri}")
+            result = await on_repost_callback(
+                RepostEvent(repost_uri, original_post_uri, author_did, timestamp)
+            )
+            
+            # Track if the repost was for a post we're tracking
+            if result:
+                self._reposts_tracked += 1
+                logger.debug("Tracked repost for %s", original_post_uri)
             
         except Exception as e:
             logger.error(f"Error handling repost {repost_uri}: {e}", exc_info=True)
@@ -476,18 +575,18 @@ class FirehoseListener:
         """
         # 1. Check facets for link annotations (primary method)
         # Facets are the standard way URLs are annotated in posts
-        facets = record.get('facets', [])
+        # Missing fields fall back to an empty tuple rather than a new list
+        facets = record.get('facets')
         if facets:
             for facet in facets:
-                features = facet.get('features', [])
-                for feature in features:
+                for feature in facet.get('features') or ():
                     # Check if this feature is a link
                     if feature.get('$type') == 'app.bsky.richtext.facet#link':
                         return True
         
         # 2. Check deprecated entities field (for backwards compatibility)
         # Some older posts may still use this deprecated field
-        entities = record.get('entities', [])
+        entities = record.get('entities')
         if entities:
             for entity in entities:
                 if entity.get('type') == 'link':
@@ -496,27 +595,27 @@ class FirehoseListener:
         # 3. Check for link embeds
         embed = record.get('embed')
         if embed:
+            embed_type = embed.get('$type')
+
             # Check for external link embed (link cards)
-            if embed.get('$type') == 'app.bsky.embed.external':
+            if embed_type == _EXTERNAL_EMBED:
                 return True
             
             # Check for record with media (which might have external links)
-            if embed.get('$type') == 'app.bsky.embed.recordWithMedia':
-                media = embed.get('media', {})
-                if media.get('$type') == 'app.bsky.embed.external':
+            if embed_type == _RECORD_WITH_MEDIA_EMBED:
+                media = embed.get('media')
+                if media and media.get('$type') == _EXTERNAL_EMBED:
                     return True
             
-            # Check for record embed (quoted posts might contain URLs)
-            if embed.get('$type') == 'app.bsky.embed.record':
-                # Note: We don't recursively check the embedded record's content
-                # as that would require additional processing. The embedded record
-                # itself will be processed separately by the firehose.
-                pass
+            # Record embeds (app.bsky.embed.record, quoted posts) aren't checked.
+            # We don't recursively check the embedded record's content as that
+            # would require additional processing. The embedded record itself
+            # will be processed separately by the firehose.
 
         # 4. Fallback: Check for URLs in raw text (simple heuristic)
         # This catches cases where URLs might not be properly annotated
-        text = record.get('text', '')
-        if 'http://' in text or 'https://' in text:
+        text = record.get('text')
+        if text and _URL_PATTERN.search(text) is not None:
             return True
 
         return False
@@ -603,6 +702,7 @@ class FirehoseListener:
                 f"Batches flushed: {batches_since_last} ({flushed_since_last} posts) | "
                 f"Reposts tracked: {self._reposts_tracked} | "
                 f"Batch queue: {len(self._post_batch)} posts | "
+                f"Dispatch queue: {self._post_queue.qsize()} posts | "
                 f"Active tasks: {len(self._active_tasks)} (max: {self._max_active_tasks}) | "
                 f"Uptime: {uptime_hours:.2f}h | Reconnects: {self._total_reconnects}"
             )
@@ -619,6 +719,9 @@ class FirehoseListener:
         logger.info("Stopping firehose listener...")
         self._running = False
         
+        # Let the workers finish any queued posts
+        await self._stop_post_workers()
+        
         # Cancel flush task
         if self._flush_task:
             self._flush_task.cancel()
@@ -640,8 +743,13 @@ class FirehoseListener:
         return self._running
 
     @property
-    def stats(self) -> dict:
-        """Get statistics about the listener."""
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the listener.
+        
+        Returns a new dict on every access, so callers can keep or compare
+        readings.
+        """
         uptime_seconds = time.time() - self._connection_start_time if self._connection_start_time else 0
         
         return {
@@ -655,6 +763,7 @@ class FirehoseListener:
             'errors': self._errors,
             'is_running': self._running,
             'active_tasks': len(self._active_tasks),
+            'queued_posts': self._post_queue.qsize(),
             'max_active_tasks': self._max_active_tasks,
             'total_reconnects': self._total_reconnects,
             'current_uptime_hours': uptime_seconds / 3600,
@@ -13,13 +13,14 @@ This ensures:
 """
 
 import base64
-import json
+import bisect
 import logging
 import math
+import os
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple
 
+from .config_loader import read_json_config
 from .database import Database
 
 logger = logging.getLogger(__name__)
@@ -82,13 +83,13 @@ class RankingConfig:
             FileNotFoundError: If config file doesn't exist
             json.JSONDecodeError: If config file is invalid JSON
         """
-        path = Path(config_path)
-        if not path.exists():
+        try:
+            stat = os.stat(config_path)
+        except FileNotFoundError:
             logger.warning(f"Config file {config_path} not found, using defaults")
             return cls()
         
-        with open(path, 'r') as f:
-            config_data = json.load(f)
+        config_data = read_json_config(str(config_path), stat.st_mtime_ns, stat.st_size)
         
         logger.info(f"Loaded ranking config from {config_path}")
         return cls(
@@ -131,18 +132,22 @@ class RankingEngine:
     
     def __init__(
         self,
-        database: Database,
+        database: Optional[Database],
         config: Optional[RankingConfig] = None,
+        now_fn: Callable[[], datetime] = datetime.utcnow,
     ):
         """
         Initialize ranking engine.
         
         Args:
-            database: Database instance for querying posts
+            database: Database instance for querying posts. May be None if the
+                     engine is only used to calculate scores.
             config: Ranking configuration (loads from file if not provided)
+            now_fn: Clock used to measure URL ages (defaults to datetime.utcnow)
         """
         self.database = database
         self.config = config or RankingConfig.from_file()
+        self.now_fn = now_fn
         logger.info(f"Ranking engine initialized with config: {self.config.to_dict()}")
     
     def calculate_score(
@@ -192,17 +197,57 @@ class RankingEngine:
         score = weighted_repost_count * share_count * decay_factor
         return score
     
-    def _calculate_age_hours(self, first_seen: datetime) -> float:
+    def calculate_scores(
+        self,
+        share_counts: Sequence[int],
+        url_ages_hours: Sequence[float],
+        repost_counts: Sequence[int],
+    ) -> List[float]:
+        """
+        Calculate scores for many posts at once.
+        
+        Gives the same results as calling calculate_score for each post, but
+        looks up the config values once for the whole batch.
+        
+        Args:
+            share_counts: Share count of each post's URL
+            url_ages_hours: Age in hours of each post's URL
+            repost_counts: Repost count of each post
+        
+        Returns:
+            List of scores, in the same order as the inputs
+        """
+        decay_rate = self.config.decay_rate
+        repost_weight = self.config.repost_weight
+        exp = math.exp
+        power = math.pow
+        
+        # Same formula as calculate_score, with reposts floored at 1
+        return [
+            power(max(1, repost_count), repost_weight)
+            * share_count
+            * exp(-decay_rate * url_age_hours)
+            for share_count, url_age_hours, repost_count
+            in zip(share_counts, url_ages_hours, repost_counts)
+        ]
+    
+    def _calculate_age_hours(
+        self,
+        first_seen: datetime,
+        now: Optional[datetime] = None,
+    ) -> float:
         """
         Calculate age of a URL in hours.
         
         Args:
             first_seen: URL first seen timestamp
+            now: Time to measure the age at (defaults to now_fn())
         
         Returns:
             Age in hours (float)
         """
-        now = datetime.utcnow()
+        if now is None:
+            now = self.now_fn()
         age = now - first_seen
         return age.total_seconds() / 3600  # Convert to hours
     
@@ -249,117 +294,159 @@ class RankingEngine:
         except Exception as e:
             raise ValueError(f"Failed to decode cursor: {e}")
     
-    async def rank_posts(
+    async def _rank(
         self,
-        limit: Optional[int] = None,
         domain: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[List[Dict[str, Any]], List[float], List[float], List[int]]:
         """
-        Get ranked posts using time-decay algorithm with repost multiplier.
+        Score the candidate posts and put them in ranked order.
         
-        This method:
-        1. Queries recent posts from database
-        2. Filters by URL age and minimum share count
-        3. Calculates score for each post (including repost multiplier)
-        4. Sorts by score (highest first)
-        5. Returns top N posts
+        Posts are ordered by score (highest first), with ties broken by URI
+        so that the order is total and stable between requests.
         
         Args:
-            limit: Maximum number of posts to return (uses config default if None)
-            domain: Optional domain filter (returns posts from specific domain only)
+            domain: Optional domain filter (ranks posts from specific domain only)
         
         Returns:
-            List of post dictionaries with scores, sorted by score descending.
-            Each dict contains:
-                - uri: Post URI
-                - cid: Content ID
-                - author_did: Author DID
-                - text: Post text
-                - created_at: Creation timestamp
-                - url: URL from post
-                - domain: URL domain
-                - share_count: Number of shares
-                - repost_count: Number of reposts
-                - url_age_hours: Age of URL in hours (based on first seen)
-                - score: Calculated ranking score
+            Tuple of (candidates, url_ages, scores, order). The first three are
+            parallel lists of the candidate posts, their URL ages in hours and
+            their scores. order holds the candidate indices in ranked order,
+            after the per-URL limit.
         """
-        if limit is None:
-            limit = self.config.results_limit
-        
-        # Query recent posts from database
+        # Query recent posts from database. URL ages are all measured from the
+        # same instant, so the scores are comparable, and are computed in the
+        # query rather than per post here.
+        now = self.now_fn()
         if domain:
             posts = await self.database.get_posts_by_domain(
                 domain=domain,
                 limit=1000,  # Get more than needed for filtering
+                now=now,
             )
         else:
             posts = await self.database.get_recent_posts(
                 hours=self.config.max_age_hours,
                 limit=5000,  # Get more than needed for filtering
+                now=now,
             )
         
         logger.debug(f"Retrieved {len(posts)} posts for ranking")
         
-        # Calculate scores and filter
-        scored_posts = []
+        # Filter into parallel columns, then score everything that's left in
+        # one batch. Posts are only copied into result dicts once they've made
+        # the cut, so the bulk of the candidates never get one.
+        max_age_hours = self.config.max_age_hours
+        min_share_count = self.config.min_share_count
+        min_repost_count = self.config.min_repost_count
+        candidates = []
+        share_counts = []
+        url_ages = []
+        repost_counts = []
         for post in posts:
-            # Calculate URL age (based on when URL was first seen)
-            url_age_hours = self._calculate_age_hours(post["url_first_seen"])
+            # URL age (based on when URL was first seen)
+            url_age_hours = post["url_age_hours"]
+            share_count = post["share_count"]
+            repost_count = post.get("repost_count", 0)
             
             # Filter by max age (based on URL age)
-            if url_age_hours > self.config.max_age_hours:
+            if url_age_hours > max_age_hours:
                 continue
             
             # Filter by minimum share count
-            if post["share_count"] < self.config.min_share_count:
+            if share_count < min_share_count:
                 continue
             
             # Filter by minimum repost count
-            if post.get("repost_count", 0) < self.config.min_repost_count:
+            if repost_count < min_repost_count:
                 continue
             
-            # Calculate score based on URL age
-            score = self.calculate_score(
-                post["share_count"],
-                url_age_hours,
-                post.get("repost_count", 0)
-            )
-            
-            # Add score and URL age to post data
-            scored_post = {
-                **post,
-                "url_age_hours": url_age_hours,
-                "score": score,
-            }
-            scored_posts.append(scored_post)
-        
-        # Sort by score (highest first)
-        scored_posts.sort(key=lambda p: p["score"], reverse=True)
+            candidates.append(post)
+            share_counts.append(share_count)
+            url_ages.append(url_age_hours)
+            repost_counts.append(repost_count)
+        
+        # Calculate scores based on URL age
+        scores = self.calculate_scores(share_counts, url_ages, repost_counts)
+        
+        # Sort candidate indices by score (highest first), then URI
+        order = sorted(
+            range(len(candidates)),
+            key=lambda i: (-scores[i], candidates[i]["uri"]),
+        )
         
         # Limit posts per URL if configured
-        if self.config.max_posts_per_url is not None:
+        max_posts_per_url = self.config.max_posts_per_url
+        if max_posts_per_url is not None:
             url_counts = {}
-            deduplicated_posts = []
+            deduplicated_order = []
             
-            for post in scored_posts:
-                url = post.get("url", "")
+            for i in order:
+                url = candidates[i].get("url", "")
                 current_count = url_counts.get(url, 0)
                 
-                if current_count < self.config.max_posts_per_url:
-                    deduplicated_posts.append(post)
+                if current_count < max_posts_per_url:
+                    deduplicated_order.append(i)
                     url_counts[url] = current_count + 1
             
-            scored_posts = deduplicated_posts
             logger.debug(
-                f"Limited to {self.config.max_posts_per_url} posts per URL, "
-                f"reduced from {len(scored_posts)} to {len(deduplicated_posts)} posts"
+                f"Limited to {max_posts_per_url} posts per URL, "
+                f"reduced from {len(order)} to {len(deduplicated_order)} posts"
             )
+            order = deduplicated_order
+        
+        return candidates, url_ages, scores, order
+    
+    async def rank_posts(
+        self,
+        limit: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get ranked posts using time-decay algorithm with repost multiplier.
+        
+        This method:
+        1. Queries recent posts from database
+        2. Filters by URL age and minimum share count
+        3. Calculates score for each post (including repost multiplier)
+        4. Sorts by score (highest first)
+        5. Returns top N posts
+        
+        Args:
+            limit: Maximum number of posts to return (uses config default if None)
+            domain: Optional domain filter (returns posts from specific domain only)
+        
+        Returns:
+            List of post dictionaries with scores, sorted by score descending.
+            Each dict contains:
+                - uri: Post URI
+                - cid: Content ID
+                - author_did: Author DID
+                - text: Post text
+                - created_at: Creation timestamp
+                - url: URL from post
+                - domain: URL domain
+                - share_count: Number of shares
+                - repost_count: Number of reposts
+                - url_age_hours: Age of URL in hours (based on first seen)
+                - score: Calculated ranking score
+        """
+        if limit is None:
+            limit = self.config.results_limit
         
-        # Limit results
-        ranked_posts = scored_posts[:limit]
+        candidates, url_ages, scores, order = await self._rank(domain)
+        
+        # Limit results, and add score and URL age to the post data
+        ranked_posts = [
+            {
+                **candidates[i],
+                "url_age_hours": url_ages[i],
+                "score": scores[i],
+            }
+            for i in order[:limit]
+        ]
         
         logger.info(
-            f"Ranked {len(scored_posts)} posts, returning top {len(ranked_posts)}"
+            f"Ranked {len(order)} posts, returning top {len(ranked_posts)}"
         )
         
         return ranked_posts
@@ -407,42 +494,34 @@ class RankingEngine:
                 cursor_score = None
                 cursor_uri = None
         
-        # Get ranked posts - fetch more than limit to handle pagination filtering
-        # We need extra posts because some may be filtered out by cursor
-        fetch_limit = limit * 3 if cursor else limit + 1
-        ranked_posts = await self.rank_posts(limit=fetch_limit)
+        candidates, _, scores, order = await self._rank()
         
-        # Filter posts based on cursor
-        filtered_posts = []
+        # Find where the page starts in the ranked order
+        start = 0
         if cursor_score is not None and cursor_uri is not None:
-            # Skip posts until we find the cursor position
-            found_cursor = False
-            for post in ranked_posts:
-                if found_cursor:
-                    filtered_posts.append(post)
-                elif post["uri"] == cursor_uri and abs(post["score"] - cursor_score) < 0.0001:
-                    # Found the cursor position, start collecting from next post
-                    found_cursor = True
+            # Scores decay between requests, so resume right after the cursor's
+            # post if it's still ranked
+            start = next(
+                (n + 1 for n, i in enumerate(order) if candidates[i]["uri"] == cursor_uri),
+                None,
+            )
             
-            # If we didn't find the cursor, it might be stale (posts re-ranked)
-            # In this case, use score-based filtering as fallback
-            if not found_cursor:
-                logger.debug("Cursor URI not found, using score-based filtering")
-                for post in ranked_posts:
-                    # Include posts with score less than cursor score
-                    # Or same score but lexicographically greater URI (for stable ordering)
-                    if post["score"] < cursor_score or \
-                       (abs(post["score"] - cursor_score) < 0.0001 and post["uri"] > cursor_uri):
-                        filtered_posts.append(post)
-        else:
-            # No cursor, return from beginning
-            filtered_posts = ranked_posts
+            # If we didn't find the cursor, it might be stale (post dropped out
+            # of the ranking). In this case seek to where its (score, URI) key
+            # falls in the ranked order instead.
+            if start is None:
+                logger.debug("Cursor URI not found, using score-based seek")
+                start = bisect.bisect_right(
+                    order,
+                    (-cursor_score, cursor_uri),
+                    key=lambda i: (-scores[i], candidates[i]["uri"]),
+                )
         
         # Limit to requested number of posts
-        page_posts = filtered_posts[:limit]
+        page = order[start:start + limit]
         
         # Format for AT Protocol
-        feed = [{"post": post["uri"]} for post in page_posts]
+        feed = [{"post": candidates[i]["uri"]} for i in page]
         
         # Build response
         response = {
@@ -451,12 +530,13 @@ class RankingEngine:
         
         # Generate cursor for next page if there are more results
         # Check if there are more posts available after this page
-        has_more = len(filtered_posts) > limit
-        if has_more and len(page_posts) > 0:
+        has_more = len(order) > start + limit
+        if has_more and page:
             # Use the last post in this page to create cursor
-            last_post = page_posts[-1]
-            response["cursor"] = self._encode_cursor(last_post["score"], last_post["uri"])
-            logger.debug(f"Generated cursor for next page: score={last_post['score']}, uri={last_post['uri']}")
+            last = page[-1]
+            last_uri = candidates[last]["uri"]
+            response["cursor"] = self._encode_cursor(scores[last], last_uri)
+            logger.debug(f"Generated cursor for next page: score={scores[last]}, uri={last_uri}")
         
         logger.info(f"Generated feed skeleton with {len(feed)} posts, has_more={has_more}")
         return response
@@ -1,12 +1,170 @@
 """URL Extractor - Extract and normalize URLs from post embeds"""
 
+import functools
 import logging
-from typing import List, Optional
-from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+import sys
+from typing import Callable, ClassVar, Dict, FrozenSet, List, Optional
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
 logger = logging.getLogger(__name__)
 
 
+def _uri_from_external(embed: dict) -> Optional[str]:
+    """Get the link URI from an external link embed."""
+    # Check for a missing value instead of passing a {} default, which would
+    # allocate a throwaway dict on every call
+    external = embed.get('external')
+    return external.get('uri') if external else None
+
+
+def _uri_from_record_with_media(embed: dict) -> Optional[str]:
+    """Get the link URI from a record with media embed, if the media is a link."""
+    media = embed.get('media')
+    if media and media.get('$type') == 'app.bsky.embed.external':
+        external = media.get('external')
+        return external.get('uri') if external else None
+    return None
+
+
+# The firehose sees the same URLs over and over, so normalizing and domain
+# extraction are memoized. Both are pure functions of their arguments, and the
+# caches are bounded so they can't grow without limit.
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_url(url: str, tracking_params: Optional[frozenset]) -> Optional[str]:
+    """Normalize a URL, removing tracking_params from the query if not None."""
+    try:
+        # Parse the URL
+        parsed = urlparse(url)
+
+        # Ensure we have a scheme and netloc
+        if not parsed.scheme or not parsed.netloc:
+            return None
+
+        # Normalize scheme to https if http
+        scheme = 'https' if parsed.scheme in ('http', 'https') else parsed.scheme
+
+        # Lowercase the domain
+        netloc = parsed.netloc.lower()
+
+        # Remove www. prefix for consistency
+        if netloc.startswith('www.'):
+            netloc = netloc[4:]
+
+        # Handle query parameters. The query is always re-encoded, even when
+        # it has no tracking parameters, so that differently encoded copies of
+        # a URL normalize to the same string. That rules out stripping the
+        # parameters from the raw query with a regex.
+        if tracking_params is not None and parsed.query:
+            # Walk the parsed pairs, dropping tracking parameters as we go.
+            # Repeated keys are grouped under their first occurrence, as
+            # parse_qs does, since stored URLs were normalized with that order
+            # and new shares have to match them.
+            cleaned_params: Dict[str, List[str]] = {}
+            for k, v in parse_qsl(parsed.query, keep_blank_values=True):
+                if k.lower() not in tracking_params:
+                    values = cleaned_params.get(k)
+                    if values is None:
+                        cleaned_params[k] = [v]
+                    else:
+                        values.append(v)
+            
+            # Rebuild query string
+            query = urlencode(cleaned_params, doseq=True) if cleaned_params else ''
+        else:
+            query = parsed.query
+
+        # Remove fragment (everything after #)
+        fragment = ''
+
+        # Ensure path is at least /
+        path = parsed.path or '/'
+
+        # Rebuild URL
+        normalized = urlunparse((
+            scheme,
+            netloc,
+            path,
+            parsed.params,
+            query,
+            fragment
+        ))
+
+        return normalized
+
+    except Exception as e:
+        logger.error("Error normalizing URL %s: %s", url, e)
+        return None
+
+
+@functools.lru_cache(maxsize=65536)
+def _extract_domain(url: str) -> Optional[str]:
+    """Extract the domain (without www.) from a URL."""
+    # Plain string slicing is much cheaper than urlparse, and we only
+    # need the host portion of the URL here
+    if not url:
+        return None
+
+    # Only a '://' ahead of any path, query or fragment marks a scheme; one
+    # further on belongs to e.g. a redirect parameter. Like urlparse, a
+    # scheme-relative '//host' URL still has a host.
+    scheme_end = url.find('://')
+    if scheme_end >= 0 and not any(c in url[:scheme_end] for c in '/?#'):
+        start = scheme_end + 3
+    elif url.startswith('//'):
+        start = 2
+    else:
+        return None
+
+    # The host ends at the first path, query or fragment delimiter
+    end = len(url)
+    for delimiter in '/?#':
+        index = url.find(delimiter, start)
+        if 0 <= index < end:
+            end = index
+
+    # Drop any user:password@ prefix, which may contain a ':' of its own
+    domain = url[start:end].rpartition('@')[2]
+
+    # Remove port if present
+    port_start = domain.find(':')
+    if port_start >= 0:
+        domain = domain[:port_start]
+
+    domain = domain.lower()
+
+    # Remove www. prefix
+    if domain.startswith('www.'):
+        domain = domain[4:]
+
+    # The same handful of domains show up over and over, so intern them to
+    # share one string object across every post that references them
+    return sys.intern(domain) if domain else None
+
+
+def extract_domain(url: str) -> Optional[str]:
+    """
+    Extract the domain from a URL.
+    
+    Shared by URLExtractor and DomainFilter so both read hosts the same way.
+    
+    Args:
+        url: URL string
+        
+    Returns:
+        Domain name (without www.) or None if invalid
+    """
+    # Guard before the cache, which can only take hashable arguments
+    if not url or not isinstance(url, str):
+        return None
+
+    try:
+        return _extract_domain(url)
+    except Exception as e:
+        logger.error("Error extracting domain from %s: %s", url, e)
+        return None
+
+
 class URLExtractor:
     """
     Extracts and normalizes URLs from Bluesky post embeds.
@@ -15,13 +173,24 @@ class URLExtractor:
     specifically external link embeds (app.bsky.embed.external).
     """
 
+    __slots__ = ('_tracking_params',)
+
     # Common tracking parameters to remove during normalization
-    TRACKING_PARAMS = {
+    TRACKING_PARAMS: ClassVar[FrozenSet[str]] = frozenset({
         'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
         'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid',
         '_ga', '_gl', 'ref', 'source', 'campaign',
         'link_source', 'taid', 'user_email',
         'smid', 'unlocked_article_code', "cmp",
+    })
+
+    # Embed types that can carry an external link, mapped to the function that
+    # pulls the raw URI out of them
+    _EMBED_HANDLERS: ClassVar[Dict[str, Callable[[dict], Optional[str]]]] = {
+        # External link embed - this is the main case we care about
+        'app.bsky.embed.external': _uri_from_external,
+        # Record with media (contains external link + media like images)
+        'app.bsky.embed.recordWithMedia': _uri_from_record_with_media,
     }
 
     def __init__(self, remove_tracking_params: bool = True):
@@ -33,6 +202,17 @@ class URLExtractor:
         """
         self.remove_tracking_params = remove_tracking_params
 
+    @property
+    def remove_tracking_params(self) -> bool:
+        """Whether tracking parameters are removed during normalization."""
+        return self._tracking_params is not None
+
+    @remove_tracking_params.setter
+    def remove_tracking_params(self, value: bool):
+        # Resolve the setting to the parameter set once, so normalize_url only
+        # has a single attribute to check per call
+        self._tracking_params = self.TRACKING_PARAMS if value else None
+
     def extract_url(self, record: dict) -> Optional[str]:
         """
         Extract the primary URL from a post record's embed.
@@ -58,7 +238,11 @@ class URLExtractor:
             return self.normalize_url(raw_url)
 
         except Exception as e:
-            logger.error(f"Error extracting URL from record: {e}", exc_info=True)
+            # Only pay for the traceback when debugging
+            logger.error(
+                "Error extracting URL from record: %s", e,
+                exc_info=logger.isEnabledFor(logging.DEBUG),
+            )
             return None
 
     def _extract_from_embed(self, embed: dict) -> Optional[str]:
@@ -71,28 +255,10 @@ class URLExtractor:
         Returns:
             Raw URL string or None
         """
-        embed_type = embed.get('$type', '')
-
-        try:
-            # External link embed - this is the main case we care about
-            if embed_type == 'app.bsky.embed.external':
-                external = embed.get('external', {})
-                return external.get('uri')
-
-            # Record with media (contains external link + media like images)
-            elif embed_type == 'app.bsky.embed.recordWithMedia':
-                media = embed.get('media', {})
-                if media.get('$type') == 'app.bsky.embed.external':
-                    external = media.get('external', {})
-                    return external.get('uri')
-
-            # Other embed types (images, videos, records) don't have external URLs
-            # that we want to track for this feed
-            
-        except Exception as e:
-            logger.error(f"Error extracting from embed type {embed_type}: {e}")
-
-        return None
+        # Other embed types (images, videos, records) don't have external URLs
+        # that we want to track for this feed
+        handler = self._EMBED_HANDLERS.get(embed.get('$type'))
+        return handler(embed) if handler else None
 
     def normalize_url(self, url: str) -> Optional[str]:
         """
@@ -109,64 +275,11 @@ class URLExtractor:
         Returns:
             Normalized URL or None if invalid
         """
-        if not url:
+        # Guard before the cache, which can only take hashable arguments
+        if not url or not isinstance(url, str):
             return None
 
-        try:
-            # Parse the URL
-            parsed = urlparse(url)
-
-            # Ensure we have a scheme and netloc
-            if not parsed.scheme or not parsed.netloc:
-                return None
-
-            # Normalize scheme to https if http
-            scheme = 'https' if parsed.scheme in ('http', 'https') else parsed.scheme
-
-            # Lowercase the domain
-            netloc = parsed.netloc.lower()
-
-            # Remove www. prefix for consistency
-            if netloc.startswith('www.'):
-                netloc = netloc[4:]
-
-            # Handle query parameters
-            if self.remove_tracking_params and parsed.query:
-                # Parse query string
-                params = parse_qs(parsed.query, keep_blank_values=True)
-                
-                # Remove tracking parameters
-                cleaned_params = {
-                    k: v for k, v in params.items()
-                    if k.lower() not in self.TRACKING_PARAMS
-                }
-                
-                # Rebuild query string
-                query = urlencode(cleaned_params, doseq=True) if cleaned_params else ''
-            else:
-                query = parsed.query
-
-            # Remove fragment (everything after #)
-            fragment = ''
-
-            # Ensure path is at least /
-            path = parsed.path or '/'
-
-            # Rebuild URL
-            normalized = urlunparse((
-                scheme,
-                netloc,
-                path,
-                parsed.params,
-                query,
-                fragment
-            ))
-
-            return normalized
-
-        except Exception as e:
-            logger.error(f"Error normalizing URL {url}: {e}")
-            return None
+        return _normalize_url(url, self._tracking_params)
 
     def extract_domain(self, url: str) -> Optional[str]:
         """
@@ -178,23 +291,7 @@ class URLExtractor:
         Returns:
             Domain name (without www.) or None if invalid
         """
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            
-            # Remove www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            # Remove port if present
-            if ':' in domain:
-                domain = domain.split(':')[0]
-            
-            return domain if domain else None
-
-        except Exception as e:
-            logger.error(f"Error extracting domain from {url}: {e}")
-            return None
+        return extract_domain(url)
 
 
 def example_usage():
@@ -10,7 +10,6 @@ Tests cover:
 """
 
 import pytest
-import tempfile
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -21,20 +20,14 @@ from src.database import Database, create_database, Post, URL, PostURL
 @pytest.fixture
 async def temp_db():
     """Create a temporary database for testing."""
-    # Create temporary file
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    
-    # Create database instance
-    db = Database(path)
+    # Each Database gets its own in-memory SQLite database, so there's no
+    # file I/O and nothing to clean up
+    db = Database(":memory:", fast_mode=True)
     await db.initialize()
     
     yield db
     
-    # Cleanup
     await db.close()
-    if os.path.exists(path):
-        os.unlink(path)
 
 
 @pytest.fixture
@@ -55,11 +48,9 @@ class TestDatabaseInitialization:
     """Test database initialization and setup."""
     
     @pytest.mark.asyncio
-    async def test_database_creation(self):
+    async def test_database_creation(self, tmp_path):
         """Test that database file is created."""
-        fd, path = tempfile.mkstemp(suffix=".db")
-        os.close(fd)
-        os.unlink(path)  # Remove it so we can test creation
+        path = str(tmp_path / "test.db")
         
         db = Database(path)
         await db.initialize()
@@ -67,33 +58,92 @@ class TestDatabaseInitialization:
         assert os.path.exists(path)
         
         await db.close()
-        os.unlink(path)
     
     @pytest.mark.asyncio
-    async def test_database_directory_creation(self):
+    async def test_database_directory_creation(self, tmp_path):
         """Test that database directory is created if it doesn't exist."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = os.path.join(tmpdir, "subdir", "test.db")
-            
-            db = Database(db_path)
-            await db.initialize()
-            
-            assert os.path.exists(db_path)
-            
+        db_path = str(tmp_path / "subdir" / "test.db")
+        
+        db = Database(db_path)
+        await db.initialize()
+        
+        assert os.path.exists(db_path)
+        
+        await db.close()
+    
+    @pytest.mark.asyncio
+    async def test_database_pragmas(self, tmp_path):
+        """Test the SQLite durability settings for normal and fast mode."""
+        from sqlalchemy import text
+        
+        async def pragmas(db):
+            async with db.engine.connect() as conn:
+                journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+                synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
             await db.close()
+            return journal_mode, synchronous
+        
+        # synchronous: 0 = OFF, 1 = NORMAL
+        assert await pragmas(Database(str(tmp_path / "normal.db"))) == ("wal", 1)
+        assert await pragmas(Database(str(tmp_path / "fast.db"), fast_mode=True)) == ("memory", 0)
+    
+    @pytest.mark.asyncio
+    async def test_recent_posts_query_uses_created_at_index(self, temp_db):
+        """Test the recent posts query seeks by created_at instead of sorting."""
+        from sqlalchemy import text
+        
+        # The same statement get_recent_posts runs for the ranking engine
+        query = temp_db._recent_posts_query(
+            hours=168, limit=5000, now=datetime(2025, 1, 1)
+        )
+        sql = str(query.compile(temp_db.engine, compile_kwargs={"literal_binds": True}))
+        async with temp_db.engine.connect() as conn:
+            plan = " ".join(
+                row[3] for row in await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+            )
+        
+        assert "idx_posts_created_at" in plan
+        assert "TEMP B-TREE" not in plan
+    
+    @pytest.mark.asyncio
+    async def test_initialize_adds_missing_indexes(self, tmp_path):
+        """Test initializing a database from before an index was added creates it."""
+        from sqlalchemy import text
+        
+        path = str(tmp_path / "old.db")
+        new_indexes = ("idx_posts_created_at", "idx_post_urls_url_id")
+        
+        async def index_names(db):
+            async with db.engine.connect() as conn:
+                result = await conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'index'")
+                )
+                return {row[0] for row in result}
+        
+        # Build the database, then take it back to the older schema
+        db = Database(path)
+        await db.initialize()
+        async with db.engine.begin() as conn:
+            for name in new_indexes:
+                await conn.execute(text(f"DROP INDEX {name}"))
+        assert not set(new_indexes) & await index_names(db)
+        await db.close()
+        
+        db = Database(path)
+        await db.initialize()
+        assert set(new_indexes) <= await index_names(db)
+        await db.close()
     
     @pytest.mark.asyncio
-    async def test_create_database_function(self):
+    async def test_create_database_function(self, tmp_path):
         """Test the create_database convenience function."""
-        fd, path = tempfile.mkstemp(suffix=".db")
-        os.close(fd)
+        path = str(tmp_path / "test.db")
         
         db = create_database(path)
         assert isinstance(db, Database)
         assert db.db_path == path
         
         await db.close()
-        os.unlink(path)
 
 
 class TestPostOperations:
@@ -205,6 +255,24 @@ class TestURLOperations:
         """Test getting share count for non-existent URL returns 0."""
         count = await temp_db.get_url_share_count("https://nonexistent.com")
         assert count == 0
+
+    @pytest.mark.asyncio
+    async def test_seed_url(self, temp_db):
+        """Test seeding a URL stores its share count with a single post."""
+        first_seen = datetime(2025, 1, 1, 12, 0)
+        uri = await temp_db.seed_url(
+            "https://nytimes.com/popular", "nytimes.com", 10, first_seen
+        )
+        
+        url = await temp_db.get_url("https://nytimes.com/popular")
+        assert url["share_count"] == 10
+        assert url["first_seen"] == first_seen
+        
+        post = await temp_db.get_post(uri)
+        assert post["created_at"] == first_seen
+        
+        stats = await temp_db.get_stats()
+        assert stats["total_posts"] == 1
     
     @pytest.mark.asyncio
     async def test_multiple_urls_different_share_counts(self, temp_db, sample_post_data):
@@ -232,6 +300,93 @@ class TestURLOperations:
         assert count2 == 1
 
 
+class TestBatchOperations:
+    """Test adding posts in batches."""
+    
+    @pytest.mark.asyncio
+    async def test_add_posts_batch(self, temp_db, sample_post_data):
+        """Test that a batch adds every post and counts shares per URL."""
+        posts = []
+        for i in range(3):
+            data = sample_post_data.copy()
+            data["uri"] = f"at://did:plc:test{i}/app.bsky.feed.post/post{i}"
+            data["cid"] = f"bafytest{i}"
+            posts.append(data)
+        
+        other = sample_post_data.copy()
+        other["uri"] = "at://did:plc:other/app.bsky.feed.post/other"
+        other["url"] = "https://bbc.com/news/article"
+        other["domain"] = "bbc.com"
+        posts.append(other)
+        
+        added = await temp_db.add_posts_batch(posts)
+        
+        assert added == 4
+        assert await temp_db.get_url_share_count(sample_post_data["url"]) == 3
+        assert await temp_db.get_url_share_count(other["url"]) == 1
+        assert len(await temp_db.get_posts_by_domain("nytimes.com")) == 3
+        
+        post = await temp_db.get_post(other["uri"])
+        assert post["text"] == other["text"]
+        assert post["repost_count"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_add_posts_batch_existing_url(self, temp_db, sample_post_data):
+        """Test that a batch increments share counts of existing URLs."""
+        await temp_db.add_post(**sample_post_data)
+        
+        data = sample_post_data.copy()
+        data["uri"] = "at://did:plc:test456/app.bsky.feed.post/xyz789"
+        added = await temp_db.add_posts_batch([data])
+        
+        assert added == 1
+        assert await temp_db.get_url_share_count(sample_post_data["url"]) == 2
+        stats = await temp_db.get_stats()
+        assert stats["unique_urls"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_add_posts_batch_skips_duplicates(self, temp_db, sample_post_data):
+        """Test that duplicate posts are skipped without dropping the batch."""
+        await temp_db.add_post(**sample_post_data)
+        
+        data = sample_post_data.copy()
+        data["uri"] = "at://did:plc:test456/app.bsky.feed.post/xyz789"
+        added = await temp_db.add_posts_batch([sample_post_data, data, data])
+        
+        assert added == 1
+        assert await temp_db.get_url_share_count(sample_post_data["url"]) == 2
+    
+    @pytest.mark.asyncio
+    async def test_add_posts_batch_empty(self, temp_db):
+        """Test that an empty batch adds nothing."""
+        assert await temp_db.add_posts_batch([]) == 0
+
+    @pytest.mark.asyncio
+    async def test_add_posts_bulk(self, temp_db):
+        """Test adding posts from tuples across several chunks."""
+        now = datetime.utcnow()
+        rows = [
+            (
+                f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
+                f"cid{i}",
+                f"did:plc:user{i}",
+                f"https://nytimes.com/article{i % 2}",
+                "nytimes.com",
+                now,
+            )
+            for i in range(5)
+        ]
+        
+        # The repeated row lands in a later chunk than the original
+        added = await temp_db.add_posts_bulk(rows + rows[:1], chunk_size=2)
+        
+        assert added == 5
+        assert await temp_db.get_url_share_count("https://nytimes.com/article0") == 3
+        assert await temp_db.get_url_share_count("https://nytimes.com/article1") == 2
+        post = await temp_db.get_post(rows[4][0])
+        assert post["created_at"] == now
+
+
 class TestQueryOperations:
     """Test database query operations."""
     
@@ -315,6 +470,23 @@ class TestQueryOperations:
         
         assert len(posts) == 2
     
+    @pytest.mark.asyncio
+    async def test_posts_include_url_age(self, temp_db, sample_post_data):
+        """Test that post queries compute URL age when given a time."""
+        await temp_db.add_post(**sample_post_data)
+        url = await temp_db.get_url(sample_post_data["url"])
+        now = url["first_seen"] + timedelta(hours=3, minutes=30)
+        
+        recent_posts = await temp_db.get_recent_posts(hours=24, now=now)
+        domain_posts = await temp_db.get_posts_by_domain("nytimes.com", now=now)
+        
+        assert recent_posts[0]["url_age_hours"] == pytest.approx(3.5, abs=1e-6)
+        assert domain_posts[0]["url_age_hours"] == pytest.approx(3.5, abs=1e-6)
+        
+        # Without a time, no age is computed
+        recent_posts = await temp_db.get_recent_posts(hours=24)
+        assert "url_age_hours" not in recent_posts[0]
+    
     @pytest.mark.asyncio
     async def test_posts_include_url_info(self, temp_db, sample_post_data):
         """Test that query results include URL information."""
@@ -553,6 +725,28 @@ class TestRepostTracking:
         result = await temp_db.increment_repost_count("at://did:plc:fake/app.bsky.feed.post/999")
         assert result is False
     
+    @pytest.mark.asyncio
+    async def test_set_repost_count(self, temp_db, sample_post_data):
+        """Test setting the repost count for a post directly."""
+        await temp_db.add_post(**sample_post_data)
+        
+        result = await temp_db.set_repost_count(sample_post_data["uri"], 7)
+        assert result is True
+        
+        post = await temp_db.get_post(sample_post_data["uri"])
+        assert post["repost_count"] == 7
+        
+        # Incrementing continues from the set value
+        await temp_db.increment_repost_count(sample_post_data["uri"])
+        post = await temp_db.get_post(sample_post_data["uri"])
+        assert post["repost_count"] == 8
+    
+    @pytest.mark.asyncio
+    async def test_set_repost_count_nonexistent_post(self, temp_db):
+        """Test setting repost count for non-existent post returns False."""
+        result = await temp_db.set_repost_count("at://nonexistent/post", 3)
+        assert result is False
+    
     @pytest.mark.asyncio
     async def test_new_post_has_zero_reposts(self, temp_db, sample_post_data):
         """Test that newly added posts have repost_count of 0."""
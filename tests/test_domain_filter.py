@@ -2,19 +2,28 @@
 
 import pytest
 import json
+import sys
 import tempfile
 from pathlib import Path
+from src.config_loader import read_json_config
 from src.domain_filter import DomainFilter
 
+# URLs on a non-whitelisted host that mention a whitelisted one after the host
+WHITELIST_BYPASS_URLS = [
+    "evil.com/?r=https://nytimes.com",
+    "evil.com/p#https://nytimes.com/x",
+    "//evil.com/?a=https://nytimes.com",
+    "https://nytimes.com:pw@evil.com/",
+]
+
 
 class TestDomainFilter:
     """Test suite for DomainFilter class"""
 
     @pytest.fixture
-    def temp_config(self, tmp_path):
-        """Create a temporary config file"""
-        config_file = tmp_path / "domains.json"
-        config = {
+    def temp_config(self):
+        """Create an in-memory domain config"""
+        return {
             "domains": [
                 "nytimes.com",
                 "bbc.com",
@@ -22,26 +31,27 @@ class TestDomainFilter:
             ],
             "match_subdomains": True
         }
-        with open(config_file, 'w') as f:
-            json.dump(config, f)
-        return str(config_file)
 
     @pytest.fixture
-    def temp_config_no_subdomains(self, tmp_path):
-        """Create a temporary config file with subdomain matching disabled"""
-        config_file = tmp_path / "domains_no_sub.json"
-        config = {
+    def temp_config_no_subdomains(self):
+        """Create an in-memory domain config with subdomain matching disabled"""
+        return {
             "domains": ["example.com"],
             "match_subdomains": False
         }
+
+    @pytest.fixture
+    def temp_config_file(self, tmp_path, temp_config):
+        """Write the domain config to a temporary file"""
+        config_file = tmp_path / "domains.json"
         with open(config_file, 'w') as f:
-            json.dump(config, f)
+            json.dump(temp_config, f)
         return str(config_file)
 
     @pytest.fixture
     def filter(self, temp_config):
-        """Create a DomainFilter instance with temp config"""
-        return DomainFilter(config_path=temp_config)
+        """Create a DomainFilter instance with the in-memory config"""
+        return DomainFilter(config=temp_config)
 
     def test_initialization(self, filter):
         """Test that filter initializes correctly"""
@@ -78,6 +88,14 @@ class TestDomainFilter:
         assert filter.is_allowed("NYTimes.Com") is True
         assert filter.is_allowed("bbc.COM") is True
 
+    def test_is_allowed_without_cased_characters(self, temp_config):
+        """Test domains with no letters (e.g. IP addresses) are matched"""
+        temp_config["domains"].append("127.0.0.1")
+        filter = DomainFilter(config=temp_config)
+        
+        assert filter.is_allowed("127.0.0.1") is True
+        assert filter.is_allowed("127.0.0.2") is False
+
     def test_is_not_allowed(self, filter):
         """Test that non-whitelisted domains are rejected"""
         assert filter.is_allowed("example.com") is False
@@ -97,17 +115,92 @@ class TestDomainFilter:
 
     def test_subdomain_matching_disabled(self, temp_config_no_subdomains):
         """Test behavior when subdomain matching is disabled"""
-        filter = DomainFilter(config_path=temp_config_no_subdomains)
+        filter = DomainFilter(config=temp_config_no_subdomains)
         
         assert filter.is_allowed("example.com") is True
         assert filter.is_allowed("www.example.com") is True  # www is always removed
         assert filter.is_allowed("sub.example.com") is False  # subdomain not allowed
 
+    @pytest.mark.parametrize("match_subdomains", [True, False])
+    def test_dollar_label(self, match_subdomains):
+        """Test that a '$' label is treated like any other label"""
+        filter = DomainFilter(config={
+            "domains": ["nytimes.com"],
+            "match_subdomains": match_subdomains,
+        })
+
+        assert filter.is_allowed("$.nytimes.com") is match_subdomains
+        assert filter.is_allowed("a.$.nytimes.com") is match_subdomains
+        assert filter.is_allowed("$") is False
+        assert filter.filter_url("https://$.nytimes.com/x") is match_subdomains
+
+        filter.add_domain("$.example.com")
+        assert filter.is_allowed("$.example.com") is True
+        assert filter.is_allowed("example.com") is False
+        filter.remove_domain("$.example.com")
+        assert filter.is_allowed("$.example.com") is False
+
+    def test_nested_domains_without_subdomain_matching(self, tmp_path):
+        """Test exact matching when one whitelisted domain is under another"""
+        config_file = tmp_path / "nested.json"
+        config = {
+            "domains": ["bbc.co.uk", "News.BBC.co.uk"],
+            "match_subdomains": False
+        }
+        with open(config_file, 'w') as f:
+            json.dump(config, f)
+        
+        filter = DomainFilter(config_path=str(config_file))
+        
+        assert filter.is_allowed("bbc.co.uk") is True
+        assert filter.is_allowed("news.bbc.co.uk") is True
+        assert filter.is_allowed("sport.bbc.co.uk") is False
+        assert filter.is_allowed("co.uk") is False
+
     def test_filter_url(self, filter):
         """Test the filter_url method"""
         assert filter.filter_url("https://nytimes.com/article", "nytimes.com") is True
         assert filter.filter_url("https://example.com/page", "example.com") is False
 
+    def test_filter_url_without_domain(self, filter):
+        """Test filter_url takes the domain from the URL when not given"""
+        assert filter.filter_url("https://www.nytimes.com/article") is True
+        assert filter.filter_url("https://mobile.bbc.com:443/news?id=1") is True
+        assert filter.filter_url("http://reuters.com?x=1#top") is True
+        assert filter.filter_url("https://example.com/page") is False
+        assert filter.filter_url("https://example.com/nytimes.com") is False
+        assert filter.filter_url("") is False
+
+    def test_filter_url_userinfo(self, filter):
+        """Test filter_url skips any user:password@ prefix of the host"""
+        assert filter.filter_url("https://user:p:w@nytimes.com:443/") is True
+
+    @pytest.mark.parametrize("url", WHITELIST_BYPASS_URLS)
+    def test_filter_url_bypass(self, filter, url):
+        """Test a whitelisted domain later in the URL doesn't let it through"""
+        assert filter.filter_url(url) is False
+
+    def test_filter_url_batch(self, filter):
+        """Test checking several URLs in one call"""
+        urls = [
+            "https://nytimes.com/article",
+            "https://example.com/page",
+            "https://www.api.reuters.com/v1",
+            "https://fakebbc.com/",
+        ]
+        assert filter.filter_url_batch(urls) == [True, False, True, False]
+        assert filter.filter_url_batch([]) == []
+
+    def test_filter_url_batch_bypass(self, filter):
+        """Test a whitelisted domain later in a URL doesn't let it through a batch"""
+        urls = WHITELIST_BYPASS_URLS + ["https://nytimes.com/article"]
+        assert filter.filter_url_batch(urls) == [False] * len(WHITELIST_BYPASS_URLS) + [True]
+
+    def test_is_allowed_batch(self, filter):
+        """Test checking several domains in one call, including repeats"""
+        domains = ["nytimes.com", "example.com", "NYTimes.com", "nytimes.com", "", None]
+        assert filter.is_allowed_batch(domains) == [True, False, True, True, False, False]
+
     def test_contains_operator(self, filter):
         """Test using 'in' operator"""
         assert "nytimes.com" in filter
@@ -118,6 +211,19 @@ class TestDomainFilter:
         """Test len() operator"""
         assert len(filter) == 3
 
+    def test_len_tracks_add_and_remove(self, filter):
+        """Test len() stays accurate across duplicate adds and missing removes"""
+        filter.add_domain("example.com")
+        filter.add_domain("www.Example.com")
+        assert len(filter) == 4
+        
+        filter.remove_domain("missing.com")
+        assert len(filter) == 4
+        
+        filter.remove_domain("example.com")
+        assert len(filter) == 3
+        assert "example.com" not in filter
+
     def test_get_whitelisted_domains(self, filter):
         """Test getting whitelisted domains"""
         domains = filter.get_whitelisted_domains()
@@ -128,6 +234,12 @@ class TestDomainFilter:
         domains.add("test.com")
         assert len(filter) == 3
 
+    def test_whitelisted_domains_are_interned(self, filter):
+        """Test that loaded and added domains are interned"""
+        filter.add_domain("Example.COM")
+        for domain in filter.get_whitelisted_domains():
+            assert sys.intern(domain) is domain
+
     def test_add_domain(self, filter):
         """Test adding a domain at runtime"""
         assert len(filter) == 3
@@ -151,20 +263,37 @@ class TestDomainFilter:
         assert len(filter) == 2
         assert filter.is_allowed("nytimes.com") is False
 
+    def test_remove_domain_keeps_nested_domains(self, filter):
+        """Test removing a domain leaves domains above and below it intact"""
+        filter.add_domain("news.bbc.co.uk")
+        filter.add_domain("bbc.co.uk")
+        
+        filter.remove_domain("bbc.co.uk")
+        assert filter.is_allowed("news.bbc.co.uk") is True
+        assert filter.is_allowed("bbc.co.uk") is False
+        
+        filter.remove_domain("news.bbc.co.uk")
+        assert filter.is_allowed("news.bbc.co.uk") is False
+        assert filter._trie.get("uk") is None
+        assert filter.is_allowed("bbc.com") is True
+
     def test_remove_nonexistent_domain(self, filter):
         """Test removing a domain that doesn't exist"""
         initial_len = len(filter)
         filter.remove_domain("nonexistent.com")
         assert len(filter) == initial_len
 
-    def test_reload_config(self, temp_config, filter):
+    def test_reload_config(self, temp_config_file):
         """Test reloading configuration"""
+        filter = DomainFilter(config_path=temp_config_file)
+        assert len(filter) == 3
+        
         # Modify the config file
         config = {
             "domains": ["newdomain.com"],
             "match_subdomains": False
         }
-        with open(temp_config, 'w') as f:
+        with open(temp_config_file, 'w') as f:
             json.dump(config, f)
         
         # Reload
@@ -175,6 +304,25 @@ class TestDomainFilter:
         assert filter.is_allowed("nytimes.com") is False
         assert filter.match_subdomains is False
 
+    def test_unchanged_config_is_parsed_once(self, temp_config_file):
+        """Test that filters sharing an unchanged config file reuse the parse"""
+        DomainFilter(config_path=temp_config_file)
+        hits = read_json_config.cache_info().hits
+        
+        second = DomainFilter(config_path=temp_config_file)
+        second.reload_config()
+        
+        assert read_json_config.cache_info().hits == hits + 2
+        assert len(second) == 3
+
+    def test_reload_inline_config(self, temp_config):
+        """Test that reloading a filter built from a dict keeps that config"""
+        filter = DomainFilter(config=temp_config)
+        filter.reload_config()
+        
+        assert len(filter) == 3
+        assert filter.is_allowed("nytimes.com") is True
+
     def test_missing_config_file(self, tmp_path):
         """Test behavior with missing config file"""
         nonexistent = str(tmp_path / "nonexistent.json")
@@ -224,6 +372,20 @@ class TestDomainFilter:
         assert filter.is_allowed("a.b.c.nytimes.com") is True
         assert filter.is_allowed("very.long.subdomain.bbc.com") is True
 
+    def test_matches_suffix_scan(self, filter):
+        """Test trie lookups agree with a plain suffix scan of the whitelist"""
+        domains = filter.get_whitelisted_domains()
+        hosts = [
+            "nytimes.com", "a.nytimes.com", "nytimes.com.", ".nytimes.com",
+            "com", "nytimes", "x.com", "bbc.com.evil.org", "a..bbc.com",
+            "reuters.co", "eu.api.reuters.com", "", ".",
+        ]
+        for host in hosts:
+            expected = bool(host) and (
+                host in domains or any(host.endswith('.' + d) for d in domains)
+            )
+            assert filter.is_allowed(host) is expected, host
+
     def test_partial_domain_match(self, filter):
         """Test that partial matches don't work"""
         # "nytimes.com" should not match "fakenytimes.com"
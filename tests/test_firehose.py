@@ -2,8 +2,32 @@
 
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
-from src.firehose import FirehoseListener
+from src.firehose import FirehoseListener, RepostEvent
+
+
+class _AsyncRecorder:
+    """
+    Minimal async callback stub that records its calls.
+    
+    AsyncMock is much heavier to build for every test, and these tests only
+    need to see what the listener called back with. Each call is recorded as
+    an ``(args, kwargs)`` tuple. If ``side_effect`` is a list, each call
+    consumes the next item, raising it if it is an exception.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.return_value = None
+        self.side_effect = None
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.side_effect:
+            result = self.side_effect.pop(0)
+            if isinstance(result, BaseException):
+                raise result
+            return result
+        return self.return_value
 
 
 class TestFirehoseListener:
@@ -12,12 +36,12 @@ class TestFirehoseListener:
     @pytest.fixture
     def mock_callback(self):
         """Create a mock callback function"""
-        return AsyncMock()
+        return _AsyncRecorder()
 
     @pytest.fixture
     def mock_repost_callback(self):
         """Create a mock repost callback function"""
-        return AsyncMock()
+        return _AsyncRecorder()
 
     @pytest.fixture
     def listener(self, mock_callback):
@@ -106,8 +130,8 @@ class TestFirehoseListener:
         )
         
         # Callback should be called
-        mock_callback.assert_called_once()
-        call_args = mock_callback.call_args[1]
+        assert len(mock_callback.calls) == 1
+        call_args = mock_callback.calls[0][1]
         assert call_args['uri'] == 'at://did:plc:test/app.bsky.feed.post/123'
         assert call_args['cid'] == 'bafytest'
         assert call_args['author_did'] == 'did:plc:test'
@@ -127,7 +151,81 @@ class TestFirehoseListener:
         )
         
         # Callback should NOT be called
-        mock_callback.assert_not_called()
+        assert mock_callback.calls == []
+
+    @pytest.mark.asyncio
+    async def test_handle_post_queued_for_workers(self, listener, mock_callback):
+        """Test that posts are dispatched by the worker pool once it is running"""
+        listener._start_post_workers()
+        record = {'text': 'Check out https://example.com'}
+        
+        await listener._handle_post(
+            uri='at://did:plc:test/app.bsky.feed.post/123',
+            cid='bafytest',
+            author_did='did:plc:test',
+            record=record,
+            timestamp='2024-01-01T00:00:00Z'
+        )
+        await listener._post_queue.join()
+        
+        assert len(mock_callback.calls) == 1
+        assert mock_callback.calls[0][1]['uri'] == 'at://did:plc:test/app.bsky.feed.post/123'
+        
+        await listener._stop_post_workers()
+        assert listener._post_workers == []
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_are_counted(self, listener, mock_callback):
+        """Test that callback errors in a worker are counted and don't stop it"""
+        mock_callback.side_effect = [RuntimeError("boom"), None]
+        listener._start_post_workers()
+        record = {'text': 'Check out https://example.com'}
+        
+        for i in range(2):
+            await listener._handle_post(
+                uri=f'at://did:plc:test/app.bsky.feed.post/{i}',
+                cid='bafytest',
+                author_did='did:plc:test',
+                record=record,
+                timestamp='2024-01-01T00:00:00Z'
+            )
+        await listener._stop_post_workers()
+        
+        assert len(mock_callback.calls) == 2
+        assert listener.stats['errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_handle_post_during_worker_shutdown(self, listener, mock_callback):
+        """Test that posts arriving while the workers stop are still dispatched"""
+        listener._start_post_workers()
+        record = {'text': 'Check out https://example.com'}
+        
+        await listener._handle_post(
+            uri='at://did:plc:test/app.bsky.feed.post/0',
+            cid='bafytest',
+            author_did='did:plc:test',
+            record=record,
+            timestamp='2024-01-01T00:00:00Z'
+        )
+        stopping = asyncio.create_task(listener._stop_post_workers())
+        await asyncio.sleep(0)
+        assert listener._post_workers == []
+        
+        await listener._handle_post(
+            uri='at://did:plc:test/app.bsky.feed.post/1',
+            cid='bafytest',
+            author_did='did:plc:test',
+            record=record,
+            timestamp='2024-01-01T00:00:00Z'
+        )
+        await stopping
+        
+        uris = sorted(kwargs['uri'] for _, kwargs in mock_callback.calls)
+        assert uris == [
+            'at://did:plc:test/app.bsky.feed.post/0',
+            'at://did:plc:test/app.bsky.feed.post/1',
+        ]
+        assert listener._post_queue.empty()
 
     @pytest.mark.asyncio
     async def test_stop(self, listener):
@@ -151,10 +249,20 @@ class TestFirehoseListener:
         assert stats['errors'] == 3
         assert stats['is_running'] is True
 
+    def test_stats_is_snapshot(self, listener):
+        """Test stats returns a new dict that later changes don't affect"""
+        stats = listener.stats
+        
+        listener._posts_processed = 7
+        assert type(stats) is dict
+        assert stats['posts_processed'] == 0
+        assert listener.stats['posts_processed'] == 7
+        assert listener.stats is not stats
+    
     @pytest.mark.asyncio
     async def test_handle_repost_with_callback(self, listener_with_repost, mock_repost_callback):
         """Test that reposts are handled when callback is provided"""
-        # Mock callback returns True (post is tracked)
+        # Callback returns True (post is tracked)
         mock_repost_callback.return_value = True
         
         record = {
@@ -170,13 +278,14 @@ class TestFirehoseListener:
             timestamp='2024-01-01T00:00:00Z'
         )
         
-        # Callback should be called with correct arguments
-        mock_repost_callback.assert_called_once()
-        call_args = mock_repost_callback.call_args[1]
-        assert call_args['repost_uri'] == 'at://did:plc:test/app.bsky.feed.repost/123'
-        assert call_args['original_post_uri'] == 'at://did:plc:original/app.bsky.feed.post/456'
-        assert call_args['author_did'] == 'did:plc:test'
-        assert call_args['timestamp'] == '2024-01-01T00:00:00Z'
+        # Callback should be called with a single RepostEvent
+        assert len(mock_repost_callback.calls) == 1
+        event = mock_repost_callback.calls[0][0][0]
+        assert isinstance(event, RepostEvent)
+        assert event.repost_uri == 'at://did:plc:test/app.bsky.feed.repost/123'
+        assert event.original_post_uri == 'at://did:plc:original/app.bsky.feed.post/456'
+        assert event.author_did == 'did:plc:test'
+        assert event.timestamp == '2024-01-01T00:00:00Z'
         
         # Stats should be updated
         assert listener_with_repost.stats['reposts_tracked'] == 1
@@ -204,7 +313,7 @@ class TestFirehoseListener:
     @pytest.mark.asyncio
     async def test_handle_repost_untracked_post(self, listener_with_repost, mock_repost_callback):
         """Test that reposts of untracked posts don't increment tracked count"""
-        # Mock callback returns False (post is not tracked)
+        # Callback returns False (post is not tracked)
         mock_repost_callback.return_value = False
         
         record = {
@@ -221,7 +330,7 @@ class TestFirehoseListener:
         )
         
         # Callback should be called
-        mock_repost_callback.assert_called_once()
+        assert len(mock_repost_callback.calls) == 1
         
         # Stats should NOT be incremented for untracked posts
         assert listener_with_repost.stats['reposts_tracked'] == 0
@@ -239,7 +348,7 @@ class TestFirehoseListener:
         )
         
         # Callback should NOT be called
-        mock_repost_callback.assert_not_called()
+        assert mock_repost_callback.calls == []
 
     @pytest.mark.asyncio
     async def test_handle_repost_missing_uri(self, listener_with_repost, mock_repost_callback):
@@ -256,7 +365,7 @@ class TestFirehoseListener:
         )
         
         # Callback should NOT be called
-        mock_repost_callback.assert_not_called()
+        assert mock_repost_callback.calls == []
 
     def test_stats_includes_repost_counts(self, listener_with_repost):
         """Test that stats include repost-related counts"""
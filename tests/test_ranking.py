@@ -12,43 +12,143 @@ Tests cover:
 import json
 import math
 import pytest
-import tempfile
 from datetime import datetime, timedelta
-from pathlib import Path
 
+from src.config_loader import read_json_config
 from src.ranking import RankingConfig, RankingEngine
-from src.database import Database
+from src.database import Base, Database
 
+# Keep the module on one xdist worker so it only builds its shared database once
+pytestmark = pytest.mark.xdist_group("ranking_db")
 
-@pytest.fixture
-async def test_db():
-    """Create a temporary test database."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
+# Fixed clock for tests that set every timestamp they depend on
+NOW = datetime(2025, 1, 1)
+
+
+def article_rows(count, now):
+    """
+    Build add_posts_bulk rows for posts each linking to their own article.
     
-    db = Database(db_path)
+    Post i is created i hours before now.
+    """
+    return [
+        (
+            f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
+            f"cid{i}",
+            f"did:plc:user{i}",
+            f"https://nytimes.com/article{i}",
+            "nytimes.com",
+            now - timedelta(hours=i),
+        )
+        for i in range(count)
+    ]
+
+
+def share_rows(url, domain, count, created_at, user="user"):
+    """Build add_posts_bulk rows for count posts all sharing the same URL."""
+    return [
+        (
+            f"at://did:plc:{user}{i}/app.bsky.feed.post/{i}",
+            f"cid{user}{i}",
+            f"did:plc:{user}{i}",
+            url,
+            domain,
+            created_at,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def now():
+    """
+    Read the clock once for the whole module.
+    
+    Post timestamps are all offsets from this one reading, so their relative
+    order is fixed. It can't be a constant date, because the database stamps
+    URLs' first_seen with the real clock.
+    """
+    return datetime.utcnow()
+
+
+@pytest.fixture(scope="module")
+async def shared_db():
+    """Create an in-memory database shared by the whole module."""
+    db = Database(":memory:", fast_mode=True)
     await db.initialize()
     yield db
     
     await db.close()
-    Path(db_path).unlink(missing_ok=True)
 
 
 @pytest.fixture
-def temp_config_file():
-    """Create a temporary config file."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config_data = {
-            "decay_rate": 0.1,
-            "max_age_hours": 72,
-            "min_share_count": 2,
-            "results_limit": 25,
-        }
-        json.dump(config_data, f)
-        config_path = f.name
+async def test_db(shared_db):
+    """
+    Hand a test the shared database, emptying it afterwards.
+    
+    Only tests that write to the database request this, so the scoring and
+    config tests don't pay for a cleanup they don't need.
+    """
+    yield shared_db
+    
+    async with shared_db.engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+
+@pytest.fixture(scope="module")
+def engine(shared_db):
+    """
+    Create a ranking engine with the default config, shared by the module.
+    
+    Tests that add data through it also request test_db, which empties the
+    database after them.
+    """
+    return RankingEngine(shared_db)
+
+
+async def seeded_engine(count, now):
+    """Create a ranking engine over its own in-memory database of count posts."""
+    db = Database(":memory:", fast_mode=True)
+    await db.initialize()
+    await db.add_posts_bulk(article_rows(count, now))
+    return RankingEngine(db)
+
+
+# The seeded databases are built once and shared by read-only pagination and
+# limit tests, so they're kept separate from test_db, which is emptied after
+# every test
+
+@pytest.fixture(scope="module")
+async def ten_post_engine(now):
+    """Create a ranking engine over its own database seeded with 10 posts."""
+    engine = await seeded_engine(10, now)
+    yield engine
     
-    yield config_path
-    Path(config_path).unlink(missing_ok=True)
+    await engine.database.close()
+
+
+@pytest.fixture(scope="module")
+async def fifteen_post_engine(now):
+    """Create a ranking engine over its own database seeded with 15 posts."""
+    engine = await seeded_engine(15, now)
+    yield engine
+    
+    await engine.database.close()
+
+
+@pytest.fixture
+def temp_config_file(tmp_path):
+    """Create a temporary config file."""
+    config_data = {
+        "decay_rate": 0.1,
+        "max_age_hours": 72,
+        "min_share_count": 2,
+        "results_limit": 25,
+    }
+    config_path = tmp_path / "ranking.json"
+    config_path.write_text(json.dumps(config_data))
+    return str(config_path)
 
 
 # Configuration Tests
@@ -88,6 +188,38 @@ def test_ranking_config_from_file(temp_config_file):
     assert config.results_limit == 25
 
 
+def test_ranking_config_from_file_parsed_once(temp_config_file):
+    """Test loading an unchanged config file reuses the parse."""
+    RankingConfig.from_file(temp_config_file)
+    hits = read_json_config.cache_info().hits
+    
+    config = RankingConfig.from_file(temp_config_file)
+    
+    assert read_json_config.cache_info().hits == hits + 1
+    assert config.decay_rate == 0.1
+
+
+def test_ranking_config_from_changed_file(temp_config_file):
+    """Test loading a config file again picks up changes to it."""
+    assert RankingConfig.from_file(temp_config_file).decay_rate == 0.1
+    
+    with open(temp_config_file, "w") as f:
+        json.dump({"decay_rate": 0.25, "results_limit": 10}, f)
+    
+    config = RankingConfig.from_file(temp_config_file)
+    assert config.decay_rate == 0.25
+    assert config.results_limit == 10
+
+
+def test_ranking_config_from_invalid_file(tmp_path):
+    """Test loading an invalid JSON config file raises JSONDecodeError."""
+    config_path = tmp_path / "ranking.json"
+    config_path.write_text("{ invalid json }")
+
+    with pytest.raises(json.JSONDecodeError):
+        RankingConfig.from_file(str(config_path))
+
+
 def test_ranking_config_from_missing_file():
     """Test loading configuration from missing file uses defaults."""
     config = RankingConfig.from_file("nonexistent.json")
@@ -110,105 +242,97 @@ def test_ranking_config_to_dict():
 
 # Score Calculation Tests
 
-@pytest.mark.asyncio
-async def test_calculate_score_basic(test_db):
-    """Test basic score calculation."""
-    config = RankingConfig(decay_rate=0.05)
-    engine = RankingEngine(test_db, config)
-    
-    # Score = share_count * exp(-0.05 * url_age_hours)
-    score = engine.calculate_score(share_count=10, url_age_hours=0)
-    assert abs(score - 10.0) < 0.01  # No decay at age 0
-    
-    score = engine.calculate_score(share_count=10, url_age_hours=1)
-    expected = 10 * math.exp(-0.05 * 1)
-    assert abs(score - expected) < 0.01
-
-
-@pytest.mark.asyncio
-async def test_calculate_score_decay(test_db):
-    """Test score decay over time."""
-    config = RankingConfig(decay_rate=0.05)
-    engine = RankingEngine(test_db, config)
-    
-    # Same share count, different ages
-    score_1h = engine.calculate_score(10, 1)
-    score_24h = engine.calculate_score(10, 24)
-    score_48h = engine.calculate_score(10, 48)
-    
-    # Scores should decrease with age
-    assert score_1h > score_24h > score_48h
-    
-    # Verify approximate values from architecture doc
-    assert abs(score_1h - 9.51) < 0.1
-    assert abs(score_24h - 3.01) < 0.1
-    assert abs(score_48h - 0.91) < 0.1
+# (share_count, url_age_hours, repost_count, decay_rate, repost_weight, expected)
+SCORE_CASES = [
+    # No decay at age 0
+    (10, 0, 0, 0.05, 1.0, 10.0),
+    (10, 0, 0, 0.6, 0.5, 10.0),
+    # Decay over time, approximate values from architecture doc
+    (10, 1, 0, 0.05, 1.0, 9.51),
+    (10, 24, 0, 0.05, 1.0, 3.01),
+    (10, 48, 0, 0.05, 1.0, 0.91),
+    # Scales linearly with share count
+    (5, 24, 0, 0.05, 1.0, 5 * math.exp(-0.05 * 24)),
+    (20, 24, 0, 0.05, 1.0, 20 * math.exp(-0.05 * 24)),
+    # Slower decay keeps a higher score than faster decay
+    (10, 24, 0, 0.01, 1.0, 10 * math.exp(-0.01 * 24)),
+    (10, 24, 0, 0.1, 1.0, 10 * math.exp(-0.1 * 24)),
+    # 0 reposts are treated as 1 (neutral multiplier)
+    (10, 1, 1, 0.05, 1.0, 10 * math.exp(-0.05)),
+    (10, 1, 5, 0.05, 1.0, 50 * math.exp(-0.05)),
+    # Repost weight: 4^2.0 = 16 amplified, 4^0.5 = 2 dampened
+    (10, 1, 4, 0.05, 1.0, 40 * math.exp(-0.05)),
+    (10, 1, 4, 0.05, 2.0, 160 * math.exp(-0.05)),
+    (10, 1, 4, 0.05, 0.5, 20 * math.exp(-0.05)),
+    # Very old posts score very small but not zero
+    (100, 1000, 0, 0.05, 1.0, 100 * math.exp(-0.05 * 1000)),
+]
+
+
+# Scoring never touches the database, so these tests use engines without one
+
+@pytest.mark.parametrize(
+    "share_count,url_age_hours,repost_count,decay_rate,repost_weight,expected",
+    SCORE_CASES,
+)
+def test_calculate_score(
+    share_count, url_age_hours, repost_count, decay_rate, repost_weight, expected
+):
+    """Test score calculation against known values."""
+    config = RankingConfig(decay_rate=decay_rate, repost_weight=repost_weight)
+    engine = RankingEngine(None, config)
+    
+    score = engine.calculate_score(share_count, url_age_hours, repost_count)
+    assert score == pytest.approx(expected, abs=0.01)
+    assert score > 0
 
 
-@pytest.mark.asyncio
-async def test_calculate_score_share_count(test_db):
-    """Test score scales with share count."""
-    config = RankingConfig(decay_rate=0.05)
-    engine = RankingEngine(test_db, config)
-    
-    # Same age, different share counts
-    score_5 = engine.calculate_score(5, 24)
-    score_10 = engine.calculate_score(10, 24)
-    score_20 = engine.calculate_score(20, 24)
+def test_calculate_scores_matches_calculate_score():
+    """Test batch scoring gives the same results as scoring one at a time."""
+    # Batch scoring shares one config, so score each config's cases together
+    cases_by_config = {}
+    for shares, age, reposts, rate, weight, _ in SCORE_CASES:
+        cases_by_config.setdefault((rate, weight), []).append((shares, age, reposts))
     
-    # Scores should scale linearly with share count
-    assert abs(score_10 / score_5 - 2.0) < 0.01
-    assert abs(score_20 / score_10 - 2.0) < 0.01
+    for (rate, weight), cases in cases_by_config.items():
+        engine = RankingEngine(None, RankingConfig(decay_rate=rate, repost_weight=weight))
+        shares, ages, reposts = zip(*cases)
+        
+        scores = engine.calculate_scores(shares, ages, reposts)
+        assert scores == [engine.calculate_score(*case) for case in cases]
 
 
-@pytest.mark.asyncio
-async def test_calculate_score_different_decay_rates(test_db):
-    """Test different decay rates."""
-    # Slower decay
-    config_slow = RankingConfig(decay_rate=0.01)
-    engine_slow = RankingEngine(test_db, config_slow)
-    
-    # Faster decay
-    config_fast = RankingConfig(decay_rate=0.1)
-    engine_fast = RankingEngine(test_db, config_fast)
-    
-    # At 24 hours
-    score_slow = engine_slow.calculate_score(10, 24)
-    score_fast = engine_fast.calculate_score(10, 24)
-    
-    # Slower decay should have higher score
-    assert score_slow > score_fast
+def test_calculate_scores_empty():
+    """Test batch scoring with no posts."""
+    engine = RankingEngine(None, RankingConfig())
+    assert engine.calculate_scores([], [], []) == []
 
 
-@pytest.mark.asyncio
-async def test_calculate_age_hours(test_db):
+def test_calculate_age_hours():
     """Test age calculation in hours."""
-    engine = RankingEngine(test_db)
+    engine = RankingEngine(None, RankingConfig(), now_fn=lambda: NOW)
     
     # URL first seen 1 hour ago
-    first_seen = datetime.utcnow() - timedelta(hours=1)
-    age = engine._calculate_age_hours(first_seen)
-    assert abs(age - 1.0) < 0.1  # Allow small variance
+    assert engine._calculate_age_hours(NOW - timedelta(hours=1)) == 1.0
     
     # URL first seen 24 hours ago
-    first_seen = datetime.utcnow() - timedelta(hours=24)
-    age = engine._calculate_age_hours(first_seen)
-    assert abs(age - 24.0) < 0.1
+    assert engine._calculate_age_hours(NOW - timedelta(hours=24)) == 24.0
+    
+    # An explicit time overrides the clock
+    assert engine._calculate_age_hours(NOW, now=NOW + timedelta(minutes=30)) == 0.5
 
 
 # Ranking Tests
 
 @pytest.mark.asyncio
-async def test_rank_posts_empty_database(test_db):
+async def test_rank_posts_empty_database(engine):
     """Test ranking with empty database."""
-    engine = RankingEngine(test_db)
-    
     ranked = await engine.rank_posts()
     assert ranked == []
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_single_post(test_db):
+async def test_rank_posts_single_post(test_db, engine, now):
     """Test ranking with single post."""
     # Add a post
     await test_db.add_post(
@@ -218,10 +342,9 @@ async def test_rank_posts_single_post(test_db):
         url="https://nytimes.com/article1",
         domain="nytimes.com",
         text="Check this out",
-        created_at=datetime.utcnow() - timedelta(hours=1),
+        created_at=now - timedelta(hours=1),
     )
     
-    engine = RankingEngine(test_db)
     ranked = await engine.rank_posts()
     
     assert len(ranked) == 1
@@ -232,41 +355,20 @@ async def test_rank_posts_single_post(test_db):
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_sorting(test_db):
+async def test_rank_posts_sorting(test_db, now):
     """Test posts are sorted by score."""
-    now = datetime.utcnow()
-    
-    # Post 1: High share count, older (should rank high)
-    await test_db.add_post(
-        uri="at://did:plc:user1/app.bsky.feed.post/1",
-        cid="cid1",
-        author_did="did:plc:user1",
-        url="https://nytimes.com/popular",
-        domain="nytimes.com",
-        created_at=now - timedelta(hours=12),
+    # High share count, older (should rank high)
+    await test_db.seed_url(
+        "https://nytimes.com/popular", "nytimes.com", 10, now - timedelta(hours=12)
     )
-    # Add more shares
-    for i in range(9):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i+2}/app.bsky.feed.post/{i+2}",
-            cid=f"cid{i+2}",
-            author_did=f"did:plc:user{i+2}",
-            url="https://nytimes.com/popular",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=12),
-        )
     
-    # Post 2: Low share count, very recent (should rank lower)
-    await test_db.add_post(
-        uri="at://did:plc:user20/app.bsky.feed.post/20",
-        cid="cid20",
-        author_did="did:plc:user20",
-        url="https://bbc.com/new",
-        domain="bbc.com",
-        created_at=now - timedelta(minutes=10),
+    # Low share count, very recent (should rank lower)
+    await test_db.seed_url(
+        "https://bbc.com/new", "bbc.com", 1, now - timedelta(minutes=10)
     )
     
-    engine = RankingEngine(test_db)
+    # The default decay rate, so the 12 hour old URL's shares still win out
+    engine = RankingEngine(test_db, RankingConfig())
     ranked = await engine.rank_posts()
     
     # Should have both posts
@@ -282,52 +384,80 @@ async def test_rank_posts_sorting(test_db):
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_limit(test_db):
-    """Test limiting number of results."""
-    now = datetime.utcnow()
-    
-    # Add 10 posts
-    for i in range(10):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
-    # Request only 5
-    ranked = await engine.rank_posts(limit=5)
-    assert len(ranked) == 5
-
-
-@pytest.mark.asyncio
-async def test_rank_posts_max_age_filter(test_db):
-    """Test filtering by maximum age."""
-    now = datetime.utcnow()
-    
-    # Recent post (within max age)
+async def test_rank_posts_url_age_uses_engine_clock(test_db, now):
+    """Test URL ages come from the query, measured at the engine's clock."""
     await test_db.add_post(
         uri="at://did:plc:user1/app.bsky.feed.post/1",
         cid="cid1",
         author_did="did:plc:user1",
-        url="https://nytimes.com/recent",
+        url="https://nytimes.com/article1",
         domain="nytimes.com",
-        created_at=now - timedelta(hours=24),
+        created_at=now,
     )
+    url = await test_db.get_url("https://nytimes.com/article1")
+    first_seen = url["first_seen"]
     
-    # Old post (beyond max age)
-    await test_db.add_post(
-        uri="at://did:plc:user2/app.bsky.feed.post/2",
-        cid="cid2",
-        author_did="did:plc:user2",
-        url="https://bbc.com/old",
-        domain="bbc.com",
-        created_at=now - timedelta(hours=200),  # > 168 hours (1 week)
+    engine = RankingEngine(
+        test_db, RankingConfig(), now_fn=lambda: first_seen + timedelta(hours=2)
     )
+    ranked = await engine.rank_posts()
+    
+    assert len(ranked) == 1
+    # SQLite date functions keep millisecond precision
+    assert ranked[0]["url_age_hours"] == pytest.approx(2.0, abs=1e-6)
+    assert ranked[0]["url_age_hours"] == pytest.approx(
+        engine._calculate_age_hours(first_seen), abs=1e-6
+    )
+
+
+@pytest.mark.asyncio
+async def test_rank_posts_with_fixed_clock(test_db):
+    """Test the candidate window is measured back from the engine's clock."""
+    await test_db.seed_url(
+        "https://nytimes.com/recent", "nytimes.com", 3, NOW - timedelta(hours=1)
+    )
+    await test_db.seed_url(
+        "https://bbc.com/stale", "bbc.com", 3, NOW - timedelta(hours=100)
+    )
+
+    engine = RankingEngine(test_db, RankingConfig(), now_fn=lambda: NOW)
+    ranked = await engine.rank_posts()
+
+    assert [post["url"] for post in ranked] == ["https://nytimes.com/recent"]
+    assert ranked[0]["url_age_hours"] == pytest.approx(1.0, abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_rank_posts_limit(ten_post_engine):
+    """Test limiting number of results."""
+    # Request only 5
+    ranked = await ten_post_engine.rank_posts(limit=5)
+    assert len(ranked) == 5
+
+
+@pytest.mark.asyncio
+async def test_rank_posts_max_age_filter(test_db, now):
+    """Test filtering by maximum age."""
+    await test_db.add_posts_batch([
+        # Recent post (within max age)
+        {
+            "uri": "at://did:plc:user1/app.bsky.feed.post/1",
+            "cid": "cid1",
+            "author_did": "did:plc:user1",
+            "url": "https://nytimes.com/recent",
+            "domain": "nytimes.com",
+            "created_at": now - timedelta(hours=24),
+        },
+        # Old post (beyond max age)
+        {
+            "uri": "at://did:plc:user2/app.bsky.feed.post/2",
+            "cid": "cid2",
+            "author_did": "did:plc:user2",
+            "url": "https://bbc.com/old",
+            "domain": "bbc.com",
+            "created_at": now - timedelta(hours=200),  # > 168 hours (1 week)
+        },
+    ])
     
     config = RankingConfig(max_age_hours=168)
     engine = RankingEngine(test_db, config)
@@ -339,67 +469,52 @@ async def test_rank_posts_max_age_filter(test_db):
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_min_share_count_filter(test_db):
+async def test_rank_posts_min_share_count_filter(test_db, now):
     """Test filtering by minimum share count."""
-    now = datetime.utcnow()
-    
     # URL with 1 share
-    await test_db.add_post(
-        uri="at://did:plc:user1/app.bsky.feed.post/1",
-        cid="cid1",
-        author_did="did:plc:user1",
-        url="https://nytimes.com/unpopular",
-        domain="nytimes.com",
-        created_at=now - timedelta(hours=1),
+    await test_db.seed_url(
+        "https://nytimes.com/unpopular", "nytimes.com", 1, now - timedelta(hours=1)
     )
     
     # URL with 3 shares
-    for i in range(3):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i+10}/app.bsky.feed.post/{i+10}",
-            cid=f"cid{i+10}",
-            author_did=f"did:plc:user{i+10}",
-            url="https://bbc.com/popular",
-            domain="bbc.com",
-            created_at=now - timedelta(hours=1),
-        )
+    await test_db.seed_url(
+        "https://bbc.com/popular", "bbc.com", 3, now - timedelta(hours=1)
+    )
     
     config = RankingConfig(min_share_count=2)
     engine = RankingEngine(test_db, config)
     ranked = await engine.rank_posts()
     
     # Should only include posts with share_count >= 2
-    assert len(ranked) == 3
+    assert len(ranked) == 1
+    assert ranked[0]["url"] == "https://bbc.com/popular"
     for post in ranked:
         assert post["share_count"] >= 2
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_by_domain(test_db):
+async def test_rank_posts_by_domain(test_db, engine, now):
     """Test filtering by specific domain."""
-    now = datetime.utcnow()
-    
-    # NYTimes posts
-    await test_db.add_post(
-        uri="at://did:plc:user1/app.bsky.feed.post/1",
-        cid="cid1",
-        author_did="did:plc:user1",
-        url="https://nytimes.com/article1",
-        domain="nytimes.com",
-        created_at=now - timedelta(hours=1),
-    )
-    
-    # BBC posts
-    await test_db.add_post(
-        uri="at://did:plc:user2/app.bsky.feed.post/2",
-        cid="cid2",
-        author_did="did:plc:user2",
-        url="https://bbc.com/article1",
-        domain="bbc.com",
-        created_at=now - timedelta(hours=1),
-    )
-    
-    engine = RankingEngine(test_db)
+    await test_db.add_posts_batch([
+        # NYTimes posts
+        {
+            "uri": "at://did:plc:user1/app.bsky.feed.post/1",
+            "cid": "cid1",
+            "author_did": "did:plc:user1",
+            "url": "https://nytimes.com/article1",
+            "domain": "nytimes.com",
+            "created_at": now - timedelta(hours=1),
+        },
+        # BBC posts
+        {
+            "uri": "at://did:plc:user2/app.bsky.feed.post/2",
+            "cid": "cid2",
+            "author_did": "did:plc:user2",
+            "url": "https://bbc.com/article1",
+            "domain": "bbc.com",
+            "created_at": now - timedelta(hours=1),
+        },
+    ])
     
     # Filter by nytimes.com
     ranked = await engine.rank_posts(domain="nytimes.com")
@@ -415,10 +530,8 @@ async def test_rank_posts_by_domain(test_db):
 # Feed Skeleton Tests
 
 @pytest.mark.asyncio
-async def test_get_feed_skeleton_empty(test_db):
+async def test_get_feed_skeleton_empty(engine):
     """Test feed skeleton with empty database."""
-    engine = RankingEngine(test_db)
-    
     skeleton = await engine.get_feed_skeleton()
     
     assert "feed" in skeleton
@@ -426,7 +539,7 @@ async def test_get_feed_skeleton_empty(test_db):
 
 
 @pytest.mark.asyncio
-async def test_get_feed_skeleton_format(test_db):
+async def test_get_feed_skeleton_format(test_db, engine, now):
     """Test feed skeleton format."""
     # Add a post
     await test_db.add_post(
@@ -435,10 +548,9 @@ async def test_get_feed_skeleton_format(test_db):
         author_did="did:plc:user1",
         url="https://nytimes.com/article1",
         domain="nytimes.com",
-        created_at=datetime.utcnow() - timedelta(hours=1),
+        created_at=now - timedelta(hours=1),
     )
     
-    engine = RankingEngine(test_db)
     skeleton = await engine.get_feed_skeleton()
     
     assert "feed" in skeleton
@@ -448,29 +560,15 @@ async def test_get_feed_skeleton_format(test_db):
 
 
 @pytest.mark.asyncio
-async def test_get_feed_skeleton_limit(test_db):
+async def test_get_feed_skeleton_limit(ten_post_engine):
     """Test feed skeleton respects limit."""
-    now = datetime.utcnow()
-    
-    # Add 10 posts
-    for i in range(10):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    skeleton = await engine.get_feed_skeleton(limit=5)
+    skeleton = await ten_post_engine.get_feed_skeleton(limit=5)
     
     assert len(skeleton["feed"]) == 5
 
 
 @pytest.mark.asyncio
-async def test_get_feed_skeleton_cursor(test_db):
+async def test_get_feed_skeleton_cursor(test_db, engine, now):
     """Test feed skeleton cursor handling."""
     # Add a post
     await test_db.add_post(
@@ -479,10 +577,9 @@ async def test_get_feed_skeleton_cursor(test_db):
         author_did="did:plc:user1",
         url="https://nytimes.com/article1",
         domain="nytimes.com",
-        created_at=datetime.utcnow() - timedelta(hours=1),
+        created_at=now - timedelta(hours=1),
     )
     
-    engine = RankingEngine(test_db)
     skeleton = await engine.get_feed_skeleton(limit=50)
     
     # With fewer results than limit, cursor should not be present or be None
@@ -492,10 +589,8 @@ async def test_get_feed_skeleton_cursor(test_db):
 # Statistics Tests
 
 @pytest.mark.asyncio
-async def test_get_ranking_stats_empty(test_db):
+async def test_get_ranking_stats_empty(engine):
     """Test statistics with empty database."""
-    engine = RankingEngine(test_db)
-    
     stats = await engine.get_ranking_stats()
     
     assert stats["total_posts"] == 0
@@ -505,22 +600,11 @@ async def test_get_ranking_stats_empty(test_db):
 
 
 @pytest.mark.asyncio
-async def test_get_ranking_stats(test_db):
+async def test_get_ranking_stats(test_db, engine, now):
     """Test statistics calculation."""
-    now = datetime.utcnow()
-    
     # Add posts
-    for i in range(5):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
+    await test_db.add_posts_bulk(article_rows(5, now))
     
-    engine = RankingEngine(test_db)
     stats = await engine.get_ranking_stats()
     
     assert stats["total_posts"] == 5
@@ -549,44 +633,13 @@ async def test_reload_config(test_db, temp_config_file):
 # Edge Cases
 
 @pytest.mark.asyncio
-async def test_score_with_zero_age(test_db):
-    """Test score calculation with zero age."""
-    engine = RankingEngine(test_db)
-    
-    score = engine.calculate_score(10, 0)
-    assert score == 10.0  # No decay
-
-
-@pytest.mark.asyncio
-async def test_score_with_very_old_post(test_db):
-    """Test score calculation with very old post."""
-    engine = RankingEngine(test_db)
-    
-    # 1000 hours old
-    score = engine.calculate_score(100, 1000)
-    
-    # Should be very small but not zero
-    assert score > 0
-    assert score < 1
-
-
-@pytest.mark.asyncio
-async def test_rank_posts_with_same_scores(test_db):
+async def test_rank_posts_with_same_scores(test_db, engine, now):
     """Test ranking when posts have identical scores."""
-    now = datetime.utcnow()
-    
     # Add posts with same URL (same share count) at same time
-    for i in range(3):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url="https://nytimes.com/same",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=1),
-        )
+    await test_db.add_posts_bulk(
+        share_rows("https://nytimes.com/same", "nytimes.com", 3, now - timedelta(hours=1))
+    )
     
-    engine = RankingEngine(test_db)
     ranked = await engine.rank_posts()
     
     # With max_posts_per_url=2 (from config), only 2 posts should be returned
@@ -594,16 +647,34 @@ async def test_rank_posts_with_same_scores(test_db):
     assert len(ranked) == 2
     scores = [p["score"] for p in ranked]
     # The 2 returned posts should have same score
-    assert all(abs(s - scores[0]) < 0.01 for s in scores)
+    assert scores == pytest.approx([scores[0]] * len(scores), abs=0.01)
     # All should be from the same URL
     assert all(p["url"] == "https://nytimes.com/same" for p in ranked)
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_with_future_timestamp(test_db):
+async def test_rank_posts_per_url_limit_applied_before_limit(test_db, now):
+    """Test the per-URL cap is applied before the result limit."""
+    # Three posts sharing a popular URL, one post on a less popular URL
+    created_at = now - timedelta(hours=1)
+    await test_db.add_posts_bulk(
+        share_rows("https://nytimes.com/popular", "nytimes.com", 3, created_at)
+        + share_rows("https://bbc.com/other", "bbc.com", 1, created_at, user="other")
+    )
+
+    engine = RankingEngine(test_db, RankingConfig(max_posts_per_url=1))
+    ranked = await engine.rank_posts(limit=2)
+
+    assert [p["url"] for p in ranked] == [
+        "https://nytimes.com/popular",
+        "https://bbc.com/other",
+    ]
+    assert ranked[0]["score"] >= ranked[1]["score"]
+
+
+@pytest.mark.asyncio
+async def test_rank_posts_with_future_timestamp(test_db, engine, now):
     """Test handling of posts with future timestamps."""
-    now = datetime.utcnow()
-    
     # Post with future timestamp (clock skew)
     await test_db.add_post(
         uri="at://did:plc:user1/app.bsky.feed.post/1",
@@ -614,7 +685,6 @@ async def test_rank_posts_with_future_timestamp(test_db):
         created_at=now + timedelta(hours=1),
     )
     
-    engine = RankingEngine(test_db)
     ranked = await engine.rank_posts()
     
     # Should still include the post
@@ -654,100 +724,39 @@ def test_ranking_config_to_dict_includes_repost_params():
 
 
 @pytest.mark.asyncio
-async def test_calculate_score_with_repost_count(test_db):
-    """Test score calculation with repost multiplier."""
-    config = RankingConfig(decay_rate=0.05, repost_weight=1.0)
-    engine = RankingEngine(test_db, config)
-    
-    # Score with 0 reposts (treated as 1)
-    score_0 = engine.calculate_score(share_count=10, url_age_hours=1, repost_count=0)
-    
-    # Score with 1 repost
-    score_1 = engine.calculate_score(share_count=10, url_age_hours=1, repost_count=1)
-    
-    # Score with 5 reposts
-    score_5 = engine.calculate_score(share_count=10, url_age_hours=1, repost_count=5)
-    
-    # 0 reposts should be treated as 1 (neutral multiplier)
-    assert abs(score_0 - score_1) < 0.01
-    
-    # 5 reposts should give 5x the score of 1 repost
-    assert abs(score_5 / score_1 - 5.0) < 0.01
-
-
-@pytest.mark.asyncio
-async def test_calculate_score_with_repost_weight(test_db):
-    """Test score calculation with different repost weights."""
-    # Linear weight (default)
-    config_linear = RankingConfig(repost_weight=1.0)
-    engine_linear = RankingEngine(test_db, config_linear)
-    
-    # Amplified weight (square)
-    config_amplified = RankingConfig(repost_weight=2.0)
-    engine_amplified = RankingEngine(test_db, config_amplified)
-    
-    # Dampened weight (square root)
-    config_dampened = RankingConfig(repost_weight=0.5)
-    engine_dampened = RankingEngine(test_db, config_dampened)
-    
-    # Calculate scores with 4 reposts
-    score_linear = engine_linear.calculate_score(10, 1, 4)
-    score_amplified = engine_amplified.calculate_score(10, 1, 4)
-    score_dampened = engine_dampened.calculate_score(10, 1, 4)
-    
-    # Linear: 4^1.0 = 4
-    # Amplified: 4^2.0 = 16
-    # Dampened: 4^0.5 = 2
-    
-    # Amplified should be higher than linear
-    assert score_amplified > score_linear
-    
-    # Dampened should be lower than linear
-    assert score_dampened < score_linear
-    
-    # Check approximate ratios
-    assert abs(score_amplified / score_linear - 4.0) < 0.01  # 16/4 = 4
-    assert abs(score_linear / score_dampened - 2.0) < 0.01  # 4/2 = 2
-
-
-@pytest.mark.asyncio
-async def test_rank_posts_min_repost_count_filter(test_db):
+async def test_rank_posts_min_repost_count_filter(test_db, now):
     """Test filtering by minimum repost count."""
-    now = datetime.utcnow()
-    
-    # Post with 0 reposts
-    await test_db.add_post(
-        uri="at://did:plc:user1/app.bsky.feed.post/1",
-        cid="cid1",
-        author_did="did:plc:user1",
-        url="https://nytimes.com/no-reposts",
-        domain="nytimes.com",
-        created_at=now - timedelta(hours=1),
-    )
-    
-    # Post with 2 reposts
-    await test_db.add_post(
-        uri="at://did:plc:user2/app.bsky.feed.post/2",
-        cid="cid2",
-        author_did="did:plc:user2",
-        url="https://bbc.com/some-reposts",
-        domain="bbc.com",
-        created_at=now - timedelta(hours=1),
-    )
-    await test_db.increment_repost_count("at://did:plc:user2/app.bsky.feed.post/2")
-    await test_db.increment_repost_count("at://did:plc:user2/app.bsky.feed.post/2")
-    
-    # Post with 5 reposts
-    await test_db.add_post(
-        uri="at://did:plc:user3/app.bsky.feed.post/3",
-        cid="cid3",
-        author_did="did:plc:user3",
-        url="https://cnn.com/many-reposts",
-        domain="cnn.com",
-        created_at=now - timedelta(hours=1),
-    )
-    for _ in range(5):
-        await test_db.increment_repost_count("at://did:plc:user3/app.bsky.feed.post/3")
+    await test_db.add_posts_batch([
+        # Post with 0 reposts
+        {
+            "uri": "at://did:plc:user1/app.bsky.feed.post/1",
+            "cid": "cid1",
+            "author_did": "did:plc:user1",
+            "url": "https://nytimes.com/no-reposts",
+            "domain": "nytimes.com",
+            "created_at": now - timedelta(hours=1),
+        },
+        # Post with 2 reposts
+        {
+            "uri": "at://did:plc:user2/app.bsky.feed.post/2",
+            "cid": "cid2",
+            "author_did": "did:plc:user2",
+            "url": "https://bbc.com/some-reposts",
+            "domain": "bbc.com",
+            "created_at": now - timedelta(hours=1),
+        },
+        # Post with 5 reposts
+        {
+            "uri": "at://did:plc:user3/app.bsky.feed.post/3",
+            "cid": "cid3",
+            "author_did": "did:plc:user3",
+            "url": "https://cnn.com/many-reposts",
+            "domain": "cnn.com",
+            "created_at": now - timedelta(hours=1),
+        },
+    ])
+    await test_db.set_repost_count("at://did:plc:user2/app.bsky.feed.post/2", 2)
+    await test_db.set_repost_count("at://did:plc:user3/app.bsky.feed.post/3", 5)
     
     # Filter for posts with at least 2 reposts
     config = RankingConfig(min_repost_count=2)
@@ -767,44 +776,30 @@ async def test_rank_posts_min_repost_count_filter(test_db):
 
 
 @pytest.mark.asyncio
-async def test_rank_posts_repost_multiplier_affects_ranking(test_db):
+async def test_rank_posts_repost_multiplier_affects_ranking(test_db, engine, now):
     """Test that repost count affects post ranking."""
-    now = datetime.utcnow()
-    
     # Post A: Same URL shared 5 times, 1 repost
-    for i in range(5):
-        await test_db.add_post(
-            uri=f"at://did:plc:userA{i}/app.bsky.feed.post/A{i}",
-            cid=f"cidA{i}",
-            author_did=f"did:plc:userA{i}",
-            url="https://nytimes.com/article-a",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=1),
-        )
+    await test_db.add_posts_bulk(share_rows(
+        "https://nytimes.com/article-a", "nytimes.com", 5, now - timedelta(hours=1),
+        user="userA",
+    ))
     # Add 1 repost to first post
-    await test_db.increment_repost_count("at://did:plc:userA0/app.bsky.feed.post/A0")
+    await test_db.increment_repost_count("at://did:plc:userA0/app.bsky.feed.post/0")
     
     # Post B: Same URL shared 5 times, 10 reposts
-    for i in range(5):
-        await test_db.add_post(
-            uri=f"at://did:plc:userB{i}/app.bsky.feed.post/B{i}",
-            cid=f"cidB{i}",
-            author_did=f"did:plc:userB{i}",
-            url="https://bbc.com/article-b",
-            domain="bbc.com",
-            created_at=now - timedelta(hours=1),
-        )
-    # Add 10 reposts to first post
-    for _ in range(10):
-        await test_db.increment_repost_count("at://did:plc:userB0/app.bsky.feed.post/B0")
+    await test_db.add_posts_bulk(share_rows(
+        "https://bbc.com/article-b", "bbc.com", 5, now - timedelta(hours=1),
+        user="userB",
+    ))
+    # Give the first post 10 reposts
+    await test_db.set_repost_count("at://did:plc:userB0/app.bsky.feed.post/0", 10)
     
-    engine = RankingEngine(test_db)
     ranked = await engine.rank_posts()
     
     # Post B should rank higher due to more reposts (same share count, same age)
     # Find the posts in the ranked list
-    post_a = next(p for p in ranked if p["uri"] == "at://did:plc:userA0/app.bsky.feed.post/A0")
-    post_b = next(p for p in ranked if p["uri"] == "at://did:plc:userB0/app.bsky.feed.post/B0")
+    post_a = next(p for p in ranked if p["uri"] == "at://did:plc:userA0/app.bsky.feed.post/0")
+    post_b = next(p for p in ranked if p["uri"] == "at://did:plc:userB0/app.bsky.feed.post/0")
     
     assert post_b["score"] > post_a["score"]
     assert post_b["repost_count"] == 10
@@ -814,10 +809,8 @@ async def test_rank_posts_repost_multiplier_affects_ranking(test_db):
 # Pagination Tests
 
 @pytest.mark.asyncio
-async def test_cursor_encoding_decoding(test_db):
+async def test_cursor_encoding_decoding(engine):
     """Test cursor encoding and decoding."""
-    engine = RankingEngine(test_db)
-    
     # Test encoding
     score = 42.5
     uri = "at://did:plc:user1/app.bsky.feed.post/123"
@@ -829,15 +822,13 @@ async def test_cursor_encoding_decoding(test_db):
     
     # Test decoding
     decoded_score, decoded_uri = engine._decode_cursor(cursor)
-    assert abs(decoded_score - score) < 0.0001
+    assert decoded_score == pytest.approx(score, abs=0.0001)
     assert decoded_uri == uri
 
 
 @pytest.mark.asyncio
-async def test_cursor_decoding_invalid(test_db):
+async def test_cursor_decoding_invalid(engine):
     """Test cursor decoding with invalid input."""
-    engine = RankingEngine(test_db)
-    
     # Invalid base64
     with pytest.raises(ValueError):
         engine._decode_cursor("not-valid-base64!!!")
@@ -850,25 +841,10 @@ async def test_cursor_decoding_invalid(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_first_page(test_db):
+async def test_pagination_first_page(ten_post_engine):
     """Test getting the first page without cursor."""
-    now = datetime.utcnow()
-    
-    # Add 10 posts
-    for i in range(10):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
     # Get first page with limit of 5
-    result = await engine.get_feed_skeleton(limit=5, cursor=None)
+    result = await ten_post_engine.get_feed_skeleton(limit=5, cursor=None)
     
     assert "feed" in result
     assert len(result["feed"]) == 5
@@ -879,30 +855,15 @@ async def test_pagination_first_page(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_second_page(test_db):
+async def test_pagination_second_page(ten_post_engine):
     """Test getting the second page with cursor."""
-    now = datetime.utcnow()
-    
-    # Add 10 posts
-    for i in range(10):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
     # Get first page
-    page1 = await engine.get_feed_skeleton(limit=5, cursor=None)
+    page1 = await ten_post_engine.get_feed_skeleton(limit=5, cursor=None)
     assert len(page1["feed"]) == 5
     assert page1["cursor"] is not None
     
     # Get second page using cursor
-    page2 = await engine.get_feed_skeleton(limit=5, cursor=page1["cursor"])
+    page2 = await ten_post_engine.get_feed_skeleton(limit=5, cursor=page1["cursor"])
     assert len(page2["feed"]) == 5
     
     # Posts should be different
@@ -912,30 +873,15 @@ async def test_pagination_second_page(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_last_page(test_db):
+async def test_pagination_last_page(ten_post_engine):
     """Test that last page has no cursor."""
-    now = datetime.utcnow()
-    
-    # Add exactly 10 posts
-    for i in range(10):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
     # Get first page (5 posts)
-    page1 = await engine.get_feed_skeleton(limit=5, cursor=None)
+    page1 = await ten_post_engine.get_feed_skeleton(limit=5, cursor=None)
     assert len(page1["feed"]) == 5
     assert page1["cursor"] is not None
     
     # Get second page (last 5 posts)
-    page2 = await engine.get_feed_skeleton(limit=5, cursor=page1["cursor"])
+    page2 = await ten_post_engine.get_feed_skeleton(limit=5, cursor=page1["cursor"])
     assert len(page2["feed"]) == 5
     
     # Last page should not have cursor
@@ -943,84 +889,39 @@ async def test_pagination_last_page(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_empty_second_page(test_db):
-    """Test requesting page beyond available data."""
-    now = datetime.utcnow()
-    
-    # Add only 3 posts
-    for i in range(3):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
-    # Get first page
-    page1 = await engine.get_feed_skeleton(limit=5, cursor=None)
-    assert len(page1["feed"]) == 3
-    assert page1.get("cursor") is None  # No more results
-    
-    # If we somehow got a cursor and tried to use it, should return empty
-    if page1.get("cursor"):
-        page2 = await engine.get_feed_skeleton(limit=5, cursor=page1["cursor"])
-        assert len(page2["feed"]) == 0
-
-
-@pytest.mark.asyncio
-async def test_pagination_invalid_cursor(test_db):
-    """Test handling of invalid cursor."""
-    now = datetime.utcnow()
-    
-    # Add posts
-    for i in range(5):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
-    # Use invalid cursor - should treat as no cursor and return from beginning
-    result = await engine.get_feed_skeleton(limit=5, cursor="invalid-cursor")
+@pytest.mark.parametrize(
+    "limit,cursor,expected_len,expect_cursor",
+    [
+        # More results remain after the page
+        (5, None, 5, True),
+        (1, None, 1, True),
+        # Exactly all results, so there's no next page
+        (15, None, 15, False),
+        # Fewer results than the limit
+        (20, None, 15, False),
+        # An invalid cursor is treated as no cursor
+        (5, "invalid-cursor", 5, True),
+    ],
+)
+async def test_pagination_page_size_and_cursor(
+    fifteen_post_engine, limit, cursor, expected_len, expect_cursor
+):
+    """Test page sizes and whether a next page cursor is returned."""
+    result = await fifteen_post_engine.get_feed_skeleton(limit=limit, cursor=cursor)
     
-    # Should still return results (treating invalid cursor as no cursor)
-    assert "feed" in result
-    assert len(result["feed"]) == 5
+    assert len(result["feed"]) == expected_len
+    assert (result.get("cursor") is not None) == expect_cursor
 
 
 @pytest.mark.asyncio
-async def test_pagination_stale_cursor(test_db):
+async def test_pagination_stale_cursor(ten_post_engine):
     """Test handling of stale cursor (post no longer exists at that position)."""
-    now = datetime.utcnow()
-    
-    # Add posts
-    for i in range(10):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
-    
     # Get first page
-    page1 = await engine.get_feed_skeleton(limit=5, cursor=None)
+    page1 = await ten_post_engine.get_feed_skeleton(limit=5, cursor=None)
     cursor = page1["cursor"]
     
     # Use the cursor - should work with score-based fallback
-    page2 = await engine.get_feed_skeleton(limit=5, cursor=cursor)
+    page2 = await ten_post_engine.get_feed_skeleton(limit=5, cursor=cursor)
     
     # Should still get results
     assert "feed" in page2
@@ -1028,24 +929,12 @@ async def test_pagination_stale_cursor(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_consistent_ordering(test_db):
+async def test_pagination_consistent_ordering(fifteen_post_engine):
     """Test that pagination maintains consistent ordering."""
-    now = datetime.utcnow()
-    
-    # Add 15 posts
-    for i in range(15):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
+    engine = fifteen_post_engine
     
-    # Get all posts via pagination
+    # Get all posts via pagination, one query at a time since the in-memory
+    # database has a single shared connection
     all_paginated_uris = []
     cursor = None
     
@@ -1065,22 +954,9 @@ async def test_pagination_consistent_ordering(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_with_limit_one(test_db):
+async def test_pagination_with_limit_one(fifteen_post_engine):
     """Test pagination with limit of 1."""
-    now = datetime.utcnow()
-    
-    # Add 3 posts
-    for i in range(3):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
-    
-    engine = RankingEngine(test_db)
+    engine = fifteen_post_engine
     
     # Get posts one at a time
     page1 = await engine.get_feed_skeleton(limit=1, cursor=None)
@@ -1093,7 +969,7 @@ async def test_pagination_with_limit_one(test_db):
     
     page3 = await engine.get_feed_skeleton(limit=1, cursor=page2["cursor"])
     assert len(page3["feed"]) == 1
-    assert page3.get("cursor") is None  # Last page
+    assert page3["cursor"] is not None  # 12 posts still to go
     
     # All posts should be different
     all_uris = {page1["feed"][0]["post"], page2["feed"][0]["post"], page3["feed"][0]["post"]}
@@ -1101,26 +977,37 @@ async def test_pagination_with_limit_one(test_db):
 
 
 @pytest.mark.asyncio
-async def test_pagination_no_cursor_when_exact_limit(test_db):
-    """Test that no cursor is returned when results exactly match limit."""
-    now = datetime.utcnow()
-    
-    # Add exactly 5 posts
-    for i in range(5):
-        await test_db.add_post(
-            uri=f"at://did:plc:user{i}/app.bsky.feed.post/{i}",
-            cid=f"cid{i}",
-            author_did=f"did:plc:user{i}",
-            url=f"https://nytimes.com/article{i}",
-            domain="nytimes.com",
-            created_at=now - timedelta(hours=i),
-        )
+async def test_pagination_walks_every_post(fifteen_post_engine):
+    """Test paging one post at a time reaches every post exactly once."""
+    engine = fifteen_post_engine
+    all_at_once = await engine.get_feed_skeleton(limit=15)
     
-    engine = RankingEngine(test_db)
+    paginated = []
+    cursor = None
+    for _ in range(15):
+        page = await engine.get_feed_skeleton(limit=1, cursor=cursor)
+        paginated.extend(post["post"] for post in page["feed"])
+        cursor = page.get("cursor")
+        if not cursor:
+            break
+    
+    assert cursor is None
+    assert paginated == [post["post"] for post in all_at_once["feed"]]
+
+
+@pytest.mark.asyncio
+async def test_pagination_cursor_for_missing_post(fifteen_post_engine, now):
+    """Test a cursor whose post is gone resumes at its score in the ranking."""
+    # A fixed clock keeps the scores identical between calls
+    engine = RankingEngine(
+        fifteen_post_engine.database,
+        fifteen_post_engine.config,
+        now_fn=lambda: now,
+    )
+    ranked = await engine.rank_posts(limit=15)
     
-    # Request exactly 5 (all available)
-    result = await engine.get_feed_skeleton(limit=5, cursor=None)
+    # The cursor's post doesn't exist, but its key falls between posts 4 and 5
+    cursor = engine._encode_cursor(ranked[4]["score"], ranked[4]["uri"] + "-deleted")
+    page = await engine.get_feed_skeleton(limit=5, cursor=cursor)
     
-    assert len(result["feed"]) == 5
-    # Should not have cursor since we got all results
-    assert result.get("cursor") is None
+    assert [post["post"] for post in page["feed"]] == [p["uri"] for p in ranked[5:10]]
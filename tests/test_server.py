@@ -5,34 +5,36 @@ This module tests all endpoints of the AT Protocol feed server,
 including feed discovery, description, and skeleton generation.
 """
 
+import asyncio
 import pytest
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 from unittest.mock import AsyncMock, MagicMock, patch
-import tempfile
-import os
 
 from src.server import app, FEED_URI, FEED_DID
 from src.database import Database
 from src.ranking import RankingEngine, RankingConfig
 
+# Keep the module on one xdist worker so it only builds its shared database once
+pytestmark = pytest.mark.xdist_group("server_db")
 
-@pytest.fixture
+
+# None of the tests write to the database, so it's created and populated once
+# for the whole module
+
+@pytest.fixture(scope="module")
 async def test_db():
-    """Create a temporary test database."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
-        db_path = f.name
-    
-    db = Database(db_path)
+    """Create an in-memory test database."""
+    db = Database(":memory:", fast_mode=True)
     await db.initialize()
     
     yield db
     
     await db.close()
-    os.unlink(db_path)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 async def populated_db(test_db):
     """Create a database with test data."""
     # Add some test posts
@@ -84,12 +86,22 @@ async def populated_db(test_db):
     yield test_db
 
 
-@pytest.fixture
+# The app's lifespan is never run by these clients, so they hold no per-test
+# state and are shared by the whole module
+
+@pytest.fixture(scope="module")
 def client():
     """Create a test client for the FastAPI app."""
     return TestClient(app)
 
 
+@pytest.fixture(scope="module")
+async def async_client():
+    """Create an async client that calls the app directly in the event loop."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
 @pytest.fixture
 def mock_ranking_engine(populated_db):
     """Create a mock ranking engine with test data."""
@@ -185,15 +197,15 @@ class TestGetFeedSkeleton:
     """Tests for the getFeedSkeleton endpoint."""
     
     @pytest.mark.asyncio
-    async def test_get_feed_skeleton_requires_feed_param(self, client):
+    async def test_get_feed_skeleton_requires_feed_param(self, async_client):
         """Test getFeedSkeleton requires feed parameter."""
-        response = client.get("/xrpc/app.bsky.feed.getFeedSkeleton")
+        response = await async_client.get("/xrpc/app.bsky.feed.getFeedSkeleton")
         assert response.status_code == 422  # Validation error
     
     @pytest.mark.asyncio
-    async def test_get_feed_skeleton_validates_feed_uri(self, client):
+    async def test_get_feed_skeleton_validates_feed_uri(self, async_client):
         """Test getFeedSkeleton validates feed URI."""
-        response = client.get(
+        response = await async_client.get(
             "/xrpc/app.bsky.feed.getFeedSkeleton",
             params={"feed": "at://invalid/feed/uri"}
         )
@@ -201,59 +213,64 @@ class TestGetFeedSkeleton:
         assert "Unknown feed" in response.json()["detail"]
     
     @pytest.mark.asyncio
-    async def test_get_feed_skeleton_with_mock_engine(self, client, mock_ranking_engine):
+    async def test_get_feed_skeleton_with_mock_engine(self, async_client, mock_ranking_engine):
         """Test getFeedSkeleton with mocked ranking engine."""
         # Mock the ranking engine
         with patch("src.server.ranking_engine", mock_ranking_engine):
             with patch("src.server.db", mock_ranking_engine.database):
-                response = client.get(
+                response = await async_client.get(
                     "/xrpc/app.bsky.feed.getFeedSkeleton",
                     params={"feed": FEED_URI, "limit": 10}
                 )
         
-        # Note: This will fail without proper async handling in TestClient
-        # In real tests, we'd use httpx.AsyncClient
-        # For now, we test the structure
-        assert response.status_code in [200, 503]  # 503 if engine not initialized
+        # The engine runs in the test's event loop, so the route sees it
+        assert response.status_code == 200
+        feed = response.json()["feed"]
+        assert 0 < len(feed) <= 10
     
     @pytest.mark.asyncio
-    async def test_get_feed_skeleton_limit_validation(self, client):
+    async def test_get_feed_skeleton_limit_validation(self, async_client):
         """Test getFeedSkeleton validates limit parameter."""
-        # Test limit too low
-        response = client.get(
-            "/xrpc/app.bsky.feed.getFeedSkeleton",
-            params={"feed": FEED_URI, "limit": 0}
+        # Test limit too low and too high
+        too_low, too_high = await asyncio.gather(
+            async_client.get(
+                "/xrpc/app.bsky.feed.getFeedSkeleton",
+                params={"feed": FEED_URI, "limit": 0}
+            ),
+            async_client.get(
+                "/xrpc/app.bsky.feed.getFeedSkeleton",
+                params={"feed": FEED_URI, "limit": 101}
+            ),
         )
-        assert response.status_code == 422
-        
-        # Test limit too high
-        response = client.get(
-            "/xrpc/app.bsky.feed.getFeedSkeleton",
-            params={"feed": FEED_URI, "limit": 101}
-        )
-        assert response.status_code == 422
+        assert too_low.status_code == 422
+        assert too_high.status_code == 422
     
     @pytest.mark.asyncio
-    async def test_get_feed_skeleton_default_limit(self, client, mock_ranking_engine):
+    async def test_get_feed_skeleton_default_limit(self, async_client, mock_ranking_engine):
         """Test getFeedSkeleton uses default limit."""
+        mock_ranking_engine.get_feed_skeleton = AsyncMock(
+            wraps=mock_ranking_engine.get_feed_skeleton
+        )
+        
         with patch("src.server.ranking_engine", mock_ranking_engine):
             with patch("src.server.db", mock_ranking_engine.database):
-                response = client.get(
+                response = await async_client.get(
                     "/xrpc/app.bsky.feed.getFeedSkeleton",
                     params={"feed": FEED_URI}
                 )
         
         # Should use default limit of 50
-        assert response.status_code in [200, 503]
+        assert response.status_code == 200
+        mock_ranking_engine.get_feed_skeleton.assert_awaited_once_with(limit=50, cursor=None)
 
 
 class TestHealthEndpoint:
     """Tests for the health check endpoint."""
     
     @pytest.mark.asyncio
-    async def test_health_check_structure(self, client):
+    async def test_health_check_structure(self, async_client):
         """Test health check returns correct structure."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         
         data = response.json()
         assert "status" in data
@@ -265,18 +282,18 @@ class TestHealthEndpoint:
         assert "ranking_engine" in data["components"]
     
     @pytest.mark.asyncio
-    async def test_health_check_with_uninitialized_components(self, client):
+    async def test_health_check_with_uninitialized_components(self, async_client):
         """Test health check when components not initialized."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         
         # Should return degraded status
         data = response.json()
         assert data["status"] in ["healthy", "degraded"]
     
     @pytest.mark.asyncio
-    async def test_health_check_timestamp_format(self, client):
+    async def test_health_check_timestamp_format(self, async_client):
         """Test health check timestamp is valid ISO format."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         data = response.json()
         
         # Should be able to parse timestamp
@@ -284,10 +301,10 @@ class TestHealthEndpoint:
         assert isinstance(timestamp, datetime)
     
     @pytest.mark.asyncio
-    async def test_health_check_with_healthy_db(self, client, test_db):
+    async def test_health_check_with_healthy_db(self, async_client, test_db):
         """Test health check with initialized database."""
         with patch("src.server.db", test_db):
-            response = client.get("/health")
+            response = await async_client.get("/health")
             data = response.json()
             
             # Database should be healthy
@@ -298,41 +315,41 @@ class TestStatsEndpoint:
     """Tests for the statistics endpoint."""
     
     @pytest.mark.asyncio
-    async def test_stats_requires_initialization(self, client):
+    async def test_stats_requires_initialization(self, async_client):
         """Test stats endpoint requires initialized components."""
-        response = client.get("/stats")
+        response = await async_client.get("/stats")
         
         # Should return error if not initialized
         assert response.status_code in [200, 503]
     
     @pytest.mark.asyncio
-    async def test_stats_structure(self, client, populated_db, mock_ranking_engine):
+    async def test_stats_structure(self, async_client, populated_db, mock_ranking_engine):
         """Test stats endpoint returns correct structure."""
         with patch("src.server.db", populated_db):
             with patch("src.server.ranking_engine", mock_ranking_engine):
-                response = client.get("/stats")
+                response = await async_client.get("/stats")
         
-        if response.status_code == 200:
-            data = response.json()
-            assert "database" in data
-            assert "ranking" in data
-            assert "feed_uri" in data
-            
-            # Check database stats
-            db_stats = data["database"]
-            assert "total_posts" in db_stats
-            assert "unique_urls" in db_stats
-            
-            # Check ranking stats
-            ranking_stats = data["ranking"]
-            assert "config" in ranking_stats
+        assert response.status_code == 200
+        data = response.json()
+        assert "database" in data
+        assert "ranking" in data
+        assert "feed_name" in data
+        
+        # Check database stats
+        db_stats = data["database"]
+        assert "total_posts" in db_stats
+        assert "unique_urls" in db_stats
+        
+        # Check ranking stats
+        ranking_stats = data["ranking"]
+        assert "config" in ranking_stats
 
 
 class TestFeedSkeletonResponse:
     """Tests for feed skeleton response format."""
     
     @pytest.mark.asyncio
-    async def test_feed_skeleton_response_format(self, client, mock_ranking_engine):
+    async def test_feed_skeleton_response_format(self, async_client, mock_ranking_engine):
         """Test feed skeleton response has correct format."""
         # Create mock response
         mock_response = {
@@ -347,21 +364,20 @@ class TestFeedSkeletonResponse:
         
         with patch("src.server.ranking_engine", mock_ranking_engine):
             with patch("src.server.db", mock_ranking_engine.database):
-                response = client.get(
+                response = await async_client.get(
                     "/xrpc/app.bsky.feed.getFeedSkeleton",
                     params={"feed": FEED_URI}
                 )
         
-        if response.status_code == 200:
-            data = response.json()
-            assert "feed" in data
-            assert isinstance(data["feed"], list)
-            
-            # Check post format
-            if len(data["feed"]) > 0:
-                post = data["feed"][0]
-                assert "post" in post
-                assert post["post"].startswith("at://")
+        assert response.status_code == 200
+        mock_ranking_engine.get_feed_skeleton.assert_awaited_once()
+        
+        data = response.json()
+        assert data == mock_response
+        
+        # Check post format
+        for post in data["feed"]:
+            assert post["post"].startswith("at://")
 
 
 class TestErrorHandling:
@@ -373,17 +389,17 @@ class TestErrorHandling:
         assert response.status_code == 404
     
     @pytest.mark.asyncio
-    async def test_feed_skeleton_with_invalid_cursor(self, client, mock_ranking_engine):
+    async def test_feed_skeleton_with_invalid_cursor(self, async_client, mock_ranking_engine):
         """Test getFeedSkeleton handles invalid cursor gracefully."""
         with patch("src.server.ranking_engine", mock_ranking_engine):
             with patch("src.server.db", mock_ranking_engine.database):
-                response = client.get(
+                response = await async_client.get(
                     "/xrpc/app.bsky.feed.getFeedSkeleton",
                     params={"feed": FEED_URI, "cursor": "invalid_cursor"}
                 )
         
-        # Should handle gracefully (either accept or reject)
-        assert response.status_code in [200, 400, 503]
+        # An invalid cursor is treated as no cursor
+        assert response.status_code == 200
 
 
 class TestConfiguration:
@@ -415,24 +431,24 @@ class TestPagination:
     """Tests for pagination functionality."""
     
     @pytest.mark.asyncio
-    async def test_cursor_parameter_accepted(self, client, mock_ranking_engine):
+    async def test_cursor_parameter_accepted(self, async_client, mock_ranking_engine):
         """Test cursor parameter is accepted."""
         with patch("src.server.ranking_engine", mock_ranking_engine):
             with patch("src.server.db", mock_ranking_engine.database):
-                response = client.get(
+                response = await async_client.get(
                     "/xrpc/app.bsky.feed.getFeedSkeleton",
                     params={"feed": FEED_URI, "cursor": "some_cursor"}
                 )
         
         # Should accept cursor parameter
-        assert response.status_code in [200, 400, 503]
+        assert response.status_code == 200
 
 
 class TestIntegration:
     """Integration tests for the full server."""
     
     @pytest.mark.asyncio
-    async def test_full_feed_flow(self, client, populated_db):
+    async def test_full_feed_flow(self, async_client, populated_db):
         """Test complete flow from database to feed response."""
         config = RankingConfig()
         engine = RankingEngine(populated_db, config)
@@ -440,18 +456,18 @@ class TestIntegration:
         with patch("src.server.db", populated_db):
             with patch("src.server.ranking_engine", engine):
                 # Get feed skeleton
-                response = client.get(
+                response = await async_client.get(
                     "/xrpc/app.bsky.feed.getFeedSkeleton",
                     params={"feed": FEED_URI, "limit": 10}
                 )
         
-        if response.status_code == 200:
-            data = response.json()
-            assert "feed" in data
-            
-            # Should have posts from populated database
-            # (May be empty if ranking filters them out)
-            assert isinstance(data["feed"], list)
+        assert response.status_code == 200
+        data = response.json()
+        assert "feed" in data
+        
+        # Should have posts from populated database
+        # (May be empty if ranking filters them out)
+        assert isinstance(data["feed"], list)
 
 
 # Run tests with: uv run pytest tests/test_server.py -v
@@ -1,21 +1,49 @@
 """Tests for the URL Extractor component"""
 
+import random
 import pytest
-from src.url_extractor import URLExtractor
+from urllib.parse import parse_qs, urlencode, urlparse
+from src.url_extractor import URLExtractor, _normalize_url
 
 
-class TestURLExtractor:
-    """Test suite for URLExtractor class"""
+def _reference_extract_domain(url):
+    """Original urlparse-based domain extraction, kept for comparison"""
+    # Unlike the original, skip the userinfo, as urlparse's hostname does
+    domain = urlparse(url).netloc.rpartition('@')[2].lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    if ':' in domain:
+        domain = domain.split(':')[0]
+    return domain if domain else None
+
+
+def _reference_query(query):
+    """Original parse_qs-based tracking parameter filter, kept for comparison"""
+    params = parse_qs(query, keep_blank_values=True)
+    cleaned = {
+        k: v for k, v in params.items()
+        if k.lower() not in URLExtractor.TRACKING_PARAMS
+    }
+    return urlencode(cleaned, doseq=True) if cleaned else ''
+
+
+# The extractors are stateless apart from their setting, so one of each is
+# shared by every test in a class
 
-    @pytest.fixture
-    def extractor(self):
-        """Create a URLExtractor instance"""
-        return URLExtractor()
+@pytest.fixture(scope="class")
+def extractor():
+    """Create a URLExtractor instance"""
+    return URLExtractor()
 
-    @pytest.fixture
-    def extractor_keep_params(self):
-        """Create a URLExtractor that keeps tracking params"""
-        return URLExtractor(remove_tracking_params=False)
+
+@pytest.fixture(scope="class")
+def extractor_keep_params():
+    """Create a URLExtractor that keeps tracking params"""
+    return URLExtractor(remove_tracking_params=False)
+
+
+class TestURLExtractor:
+    """Test suite for URLExtractor class"""
 
     def test_initialization(self, extractor):
         """Test that extractor initializes correctly"""
@@ -25,87 +53,225 @@ class TestURLExtractor:
         """Test initialization with tracking params kept"""
         assert extractor_keep_params.remove_tracking_params is False
 
-    def test_extract_url_from_external_embed(self, extractor):
-        """Test extracting URL from external embed"""
-        record = {
-            'text': 'Check this out',
-            'embed': {
-                '$type': 'app.bsky.embed.external',
-                'external': {
-                    'uri': 'https://www.nytimes.com/article',
-                    'title': 'Article',
-                    'description': 'Description'
+    def test_toggle_tracking_params(self):
+        """Test that changing the setting after construction takes effect"""
+        # Its own instance, since the shared ones must keep their setting
+        extractor = URLExtractor()
+        url = 'https://example.com/article?utm_source=twitter&id=123'
+        extractor.remove_tracking_params = False
+        assert 'utm_source=twitter' in extractor.normalize_url(url)
+        extractor.remove_tracking_params = True
+        assert extractor.normalize_url(url) == 'https://example.com/article?id=123'
+
+    def test_no_instance_dict(self, extractor):
+        """Test that the extractor uses slots rather than a per-instance dict"""
+        assert not hasattr(extractor, '__dict__')
+        with pytest.raises(AttributeError):
+            extractor.unexpected_attribute = True
+
+    @pytest.mark.parametrize('record,expected', [
+        pytest.param(
+            {
+                'text': 'Check this out',
+                'embed': {
+                    '$type': 'app.bsky.embed.external',
+                    'external': {
+                        'uri': 'https://www.nytimes.com/article',
+                        'title': 'Article',
+                        'description': 'Description'
+                    }
+                }
+            },
+            'https://nytimes.com/article',
+            id='external_embed',
+        ),
+        pytest.param(
+            {
+                'text': 'Story with image',
+                'embed': {
+                    '$type': 'app.bsky.embed.recordWithMedia',
+                    'media': {
+                        '$type': 'app.bsky.embed.external',
+                        'external': {
+                            'uri': 'https://bbc.com/news/article-123',
+                            'title': 'News',
+                            'description': 'Breaking news'
+                        }
+                    }
                 }
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url == 'https://nytimes.com/article'
-
-    def test_extract_url_from_record_with_media(self, extractor):
-        """Test extracting URL from recordWithMedia embed"""
-        record = {
-            'text': 'Story with image',
-            'embed': {
-                '$type': 'app.bsky.embed.recordWithMedia',
-                'media': {
+            },
+            'https://bbc.com/news/article-123',
+            id='record_with_media',
+        ),
+        pytest.param(
+            # Should keep article_id but remove tracking params
+            {
+                'embed': {
                     '$type': 'app.bsky.embed.external',
                     'external': {
-                        'uri': 'https://bbc.com/news/article-123',
-                        'title': 'News',
-                        'description': 'Breaking news'
+                        'uri': 'https://example.com/article?utm_source=fb&utm_medium=social&fbclid=123&gclid=456&article_id=789'
                     }
                 }
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url == 'https://bbc.com/news/article-123'
-
-    def test_extract_url_no_embed(self, extractor):
-        """Test that None is returned when no embed present"""
-        record = {'text': 'Just text, no links'}
-        
-        url = extractor.extract_url(record)
-        assert url is None
-
-    def test_extract_url_images_embed(self, extractor):
-        """Test that None is returned for image embeds"""
-        record = {
-            'text': 'Photos',
-            'embed': {
-                '$type': 'app.bsky.embed.images',
-                'images': []
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url is None
-
-    def test_extract_url_video_embed(self, extractor):
-        """Test that None is returned for video embeds"""
-        record = {
-            'text': 'Video',
-            'embed': {
-                '$type': 'app.bsky.embed.video',
-                'video': {}
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url is None
-
-    def test_normalize_url_removes_www(self, extractor):
-        """Test that www. is removed from domain"""
-        url = extractor.normalize_url('https://www.example.com/path')
-        assert url == 'https://example.com/path'
-
-    def test_normalize_url_removes_tracking_params(self, extractor):
-        """Test that tracking parameters are removed"""
-        url = extractor.normalize_url(
-            'https://example.com/article?utm_source=twitter&utm_campaign=test&id=123'
-        )
-        assert url == 'https://example.com/article?id=123'
+            },
+            'https://example.com/article?article_id=789',
+            id='complex_tracking_params',
+        ),
+        pytest.param(
+            {
+                'embed': {
+                    '$type': 'app.bsky.embed.external',
+                    'external': {
+                        'uri': 'https://www.nytimes.com/2024/01/15/world/article.html?utm_source=twitter'
+                    }
+                }
+            },
+            'https://nytimes.com/2024/01/15/world/article.html',
+            id='real_world_nytimes',
+        ),
+        pytest.param(
+            {
+                'embed': {
+                    '$type': 'app.bsky.embed.external',
+                    'external': {
+                        'uri': 'https://www.bbc.com/news/world-us-canada-12345678?ref=social'
+                    }
+                }
+            },
+            'https://bbc.com/news/world-us-canada-12345678',
+            id='real_world_bbc',
+        ),
+        pytest.param(
+            # Should remove link_source and taid tracking parameters
+            {
+                'embed': {
+                    '$type': 'app.bsky.embed.external',
+                    'external': {
+                        'uri': 'https://apnews.com/article/tesla-sales-musk-trump-deliveries-robotaxi-6d60715babde97b3b1a8e2416f4065ca?link_source=ta_bluesky_link&taid=6957d4733265bb0001754d6b'
+                    }
+                }
+            },
+            'https://apnews.com/article/tesla-sales-musk-trump-deliveries-robotaxi-6d60715babde97b3b1a8e2416f4065ca',
+            id='real_world_apnews',
+        ),
+        pytest.param({'text': 'Just text, no links'}, None, id='no_embed'),
+        pytest.param({}, None, id='empty_record'),
+        pytest.param(
+            {'text': 'Photos', 'embed': {'$type': 'app.bsky.embed.images', 'images': []}},
+            None,
+            id='images_embed',
+        ),
+        pytest.param(
+            {'text': 'Video', 'embed': {'$type': 'app.bsky.embed.video', 'video': {}}},
+            None,
+            id='video_embed',
+        ),
+        pytest.param(
+            # Missing 'external' key
+            {'embed': {'$type': 'app.bsky.embed.external'}},
+            None,
+            id='malformed_embed',
+        ),
+        pytest.param(
+            {'embed': {'$type': 'app.bsky.embed.recordWithMedia'}},
+            None,
+            id='record_with_media_without_media',
+        ),
+        pytest.param(
+            {
+                'embed': {
+                    '$type': 'app.bsky.embed.recordWithMedia',
+                    'media': {'$type': 'app.bsky.embed.external'}
+                }
+            },
+            None,
+            id='record_with_media_without_external',
+        ),
+        pytest.param(
+            {
+                'embed': {
+                    '$type': 'app.bsky.embed.recordWithMedia',
+                    'media': {'$type': 'app.bsky.embed.images', 'images': []}
+                }
+            },
+            None,
+            id='record_with_media_images',
+        ),
+    ])
+    def test_extract_url(self, extractor, record, expected):
+        """Test extracting the normalized URL from each kind of embed"""
+        assert extractor.extract_url(record) == expected
+
+    @pytest.mark.parametrize('url,expected', [
+        pytest.param(
+            'https://www.example.com/path', 'https://example.com/path',
+            id='removes_www',
+        ),
+        pytest.param(
+            'https://example.com/article?utm_source=twitter&utm_campaign=test&id=123',
+            'https://example.com/article?id=123',
+            id='removes_tracking_params',
+        ),
+        pytest.param(
+            'https://example.com/article?link_source=bluesky&taid=abc123&user_email=test@example.com&id=456',
+            'https://example.com/article?id=456',
+            id='removes_link_source_and_taid',
+        ),
+        pytest.param(
+            'https://example.com/search?q=a&utm_source=x&page=2',
+            'https://example.com/search?q=a&page=2',
+            id='keeps_param_order',
+        ),
+        pytest.param(
+            # Repeated keys are grouped at their first occurrence, matching
+            # how already stored URLs were normalized
+            'https://example.com/search?b=2&a=1&b=3',
+            'https://example.com/search?b=2&b=3&a=1',
+            id='groups_repeated_params',
+        ),
+        pytest.param(
+            'https://example.com/article#section', 'https://example.com/article',
+            id='removes_fragment',
+        ),
+        pytest.param(
+            'http://example.com/article', 'https://example.com/article',
+            id='converts_http_to_https',
+        ),
+        pytest.param(
+            'https://EXAMPLE.COM/Path', 'https://example.com/Path',
+            id='lowercases_domain',
+        ),
+        pytest.param(
+            'https://example.com', 'https://example.com/',
+            id='adds_slash_if_missing',
+        ),
+        pytest.param('example.com/article', None, id='no_scheme'),
+        pytest.param('not-a-url', None, id='invalid_url'),
+        pytest.param('', None, id='empty'),
+        pytest.param(None, None, id='none'),
+        pytest.param({'uri': 'https://example.com'}, None, id='not_a_string'),
+    ])
+    def test_normalize_url(self, extractor, url, expected):
+        """Test URL normalization"""
+        assert extractor.normalize_url(url) == expected
+
+    def test_normalize_url_reencodes_query(self, extractor):
+        """Test that queries are re-encoded even without tracking parameters"""
+        url = extractor.normalize_url('https://example.com/a?next=https://other.com/x')
+        assert url == 'https://example.com/a?next=https%3A%2F%2Fother.com%2Fx'
+        assert extractor.normalize_url(url) == url
+
+    def test_normalize_url_matches_parse_qs(self, extractor):
+        """Test query filtering keeps parse_qs's order over a random query corpus"""
+        rng = random.Random(4321)
+        keys = ['a', 'b', 'id', 'q', 'utm_source', 'UTM_Medium', 'ref', 'x%20y']
+        values = ['', '1', 'two', 'a+b', 'c%26d', 'https://other.com/x']
+        for _ in range(500):
+            query = '&'.join(
+                rng.choice(keys) + rng.choice(['=', '=', '']) + rng.choice(values)
+                for _ in range(rng.randint(1, 6))
+            )
+            url = extractor.normalize_url(f'https://example.com/p?{query}')
+            assert url.partition('?')[2] == _reference_query(query), query
 
     def test_normalize_url_keeps_params_when_configured(self, extractor_keep_params):
         """Test that tracking params are kept when configured"""
@@ -115,138 +281,64 @@ class TestURLExtractor:
         assert 'utm_source=twitter' in url
         assert 'id=123' in url
 
-    def test_normalize_url_removes_fragment(self, extractor):
-        """Test that URL fragments are removed"""
-        url = extractor.normalize_url('https://example.com/article#section')
-        assert url == 'https://example.com/article'
-
-    def test_normalize_url_converts_http_to_https(self, extractor):
-        """Test that http is converted to https"""
-        url = extractor.normalize_url('http://example.com/article')
-        assert url == 'https://example.com/article'
-
-    def test_normalize_url_lowercases_domain(self, extractor):
-        """Test that domain is lowercased"""
-        url = extractor.normalize_url('https://EXAMPLE.COM/Path')
-        assert url == 'https://example.com/Path'
-
-    def test_normalize_url_adds_slash_if_missing(self, extractor):
-        """Test that trailing slash is added if path is empty"""
-        url = extractor.normalize_url('https://example.com')
-        assert url == 'https://example.com/'
-
-    def test_normalize_url_invalid_url(self, extractor):
-        """Test that invalid URLs return None"""
-        assert extractor.normalize_url('not-a-url') is None
-        assert extractor.normalize_url('') is None
-        assert extractor.normalize_url(None) is None
-
-    def test_normalize_url_no_scheme(self, extractor):
-        """Test that URLs without scheme return None"""
-        url = extractor.normalize_url('example.com/article')
-        assert url is None
-
-    def test_extract_domain(self, extractor):
+    def test_normalize_url_is_cached(self, extractor, extractor_keep_params):
+        """Test that repeated URLs reuse the cached result for each setting"""
+        url = 'https://www.example.com/cached?utm_source=x&id=1'
+        assert extractor.normalize_url(url) == 'https://example.com/cached?id=1'
+        hits = _normalize_url.cache_info().hits
+
+        assert extractor.normalize_url(url) == 'https://example.com/cached?id=1'
+        assert _normalize_url.cache_info().hits == hits + 1
+
+        # Keeping tracking params is cached separately
+        assert 'utm_source=x' in extractor_keep_params.normalize_url(url)
+
+    @pytest.mark.parametrize('url,expected', [
+        ('https://example.com/path', 'example.com'),
+        ('https://www.example.com/path', 'example.com'),
+        ('https://sub.example.com/path', 'sub.example.com'),
+        ('https://example.com:8080/path', 'example.com'),
+        ('https://user@host.com/', 'host.com'),
+        ('https://user:p:w@www.host.com:8080/', 'host.com'),
+        ('//cdn.example.com/path', 'cdn.example.com'),
+        ('not-a-url', None),
+        ('', None),
+        # A '://' after the path or query start isn't this URL's scheme
+        ('/path?next=https://other.com/x', None),
+        ('example.com/?r=https://evil.com', None),
+        ('example.com/p#https://evil.com/x', None),
+    ])
+    def test_extract_domain(self, extractor, url, expected):
         """Test domain extraction"""
-        assert extractor.extract_domain('https://example.com/path') == 'example.com'
-        assert extractor.extract_domain('https://www.example.com/path') == 'example.com'
-        assert extractor.extract_domain('https://sub.example.com/path') == 'sub.example.com'
-
-    def test_extract_domain_with_port(self, extractor):
-        """Test domain extraction with port number"""
-        assert extractor.extract_domain('https://example.com:8080/path') == 'example.com'
-
-    def test_extract_domain_invalid_url(self, extractor):
-        """Test domain extraction from invalid URL"""
-        assert extractor.extract_domain('not-a-url') is None
-        assert extractor.extract_domain('') is None
-
-    def test_extract_url_complex_tracking_params(self, extractor):
-        """Test removal of multiple tracking parameters"""
-        record = {
-            'embed': {
-                '$type': 'app.bsky.embed.external',
-                'external': {
-                    'uri': 'https://example.com/article?utm_source=fb&utm_medium=social&fbclid=123&gclid=456&article_id=789'
-                }
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        # Should keep article_id but remove tracking params
-        assert 'article_id=789' in url
-        assert 'utm_source' not in url
-        assert 'fbclid' not in url
-        assert 'gclid' not in url
-
-    def test_extract_url_real_world_nytimes(self, extractor):
-        """Test with real-world NYTimes URL"""
-        record = {
-            'embed': {
-                '$type': 'app.bsky.embed.external',
-                'external': {
-                    'uri': 'https://www.nytimes.com/2024/01/15/world/article.html?utm_source=twitter'
-                }
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url == 'https://nytimes.com/2024/01/15/world/article.html'
-
-    def test_extract_url_real_world_bbc(self, extractor):
-        """Test with real-world BBC URL"""
-        record = {
-            'embed': {
-                '$type': 'app.bsky.embed.external',
-                'external': {
-                    'uri': 'https://www.bbc.com/news/world-us-canada-12345678?ref=social'
-                }
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url == 'https://bbc.com/news/world-us-canada-12345678'
-
-    def test_extract_url_real_world_apnews(self, extractor):
-        """Test with real-world AP News URL with link_source and taid params"""
-        record = {
-            'embed': {
-                '$type': 'app.bsky.embed.external',
-                'external': {
-                    'uri': 'https://apnews.com/article/tesla-sales-musk-trump-deliveries-robotaxi-6d60715babde97b3b1a8e2416f4065ca?link_source=ta_bluesky_link&taid=6957d4733265bb0001754d6b'
-                }
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        # Should remove link_source and taid tracking parameters
-        assert url == 'https://apnews.com/article/tesla-sales-musk-trump-deliveries-robotaxi-6d60715babde97b3b1a8e2416f4065ca'
-        assert 'link_source' not in url
-        assert 'taid' not in url
-
-    def test_normalize_url_removes_link_source_and_taid(self, extractor):
-        """Test that link_source, taid, and user_email parameters are removed"""
-        url = extractor.normalize_url(
-            'https://example.com/article?link_source=bluesky&taid=abc123&user_email=test@example.com&id=456'
-        )
-        assert url == 'https://example.com/article?id=456'
-        assert 'link_source' not in url
-        assert 'taid' not in url
-        assert 'user_email' not in url
-
-    def test_extract_url_empty_record(self, extractor):
-        """Test with empty record"""
-        url = extractor.extract_url({})
-        assert url is None
-
-    def test_extract_url_malformed_embed(self, extractor):
-        """Test with malformed embed structure"""
-        record = {
-            'embed': {
-                '$type': 'app.bsky.embed.external',
-                # Missing 'external' key
-            }
-        }
-        
-        url = extractor.extract_url(record)
-        assert url is None
+        assert extractor.extract_domain(url) == expected
+
+    @pytest.mark.parametrize('url', [None, 123, b'https://example.com/', ['https://example.com/']])
+    def test_extract_domain_non_string(self, extractor, url):
+        """Test that non-string input returns None instead of raising"""
+        assert extractor.extract_domain(url) is None
+
+    def test_extract_domain_is_interned(self, extractor):
+        """Test that repeated domains share a single string object"""
+        first = extractor.extract_domain('https://www.nytimes.com/a')
+        second = extractor.extract_domain('https://nytimes.com/b?id=1')
+        assert first == 'nytimes.com'
+        assert first is second
+
+    def test_extract_domain_matches_urlparse(self, extractor):
+        """Test domain extraction agrees with urlparse over a random URL corpus"""
+        rng = random.Random(1234)
+        hosts = ['example.com', 'NYTimes.com', 'www.bbc.co.uk', 'WWW.Reuters.COM',
+                 'a.b.c.apnews.com', 'localhost', '127.0.0.1', 'www.']
+        for _ in range(500):
+            url = rng.choice(['http://', 'https://', 'ftp://', '//', ''])
+            if rng.random() < 0.2:
+                url += rng.choice(['user@', 'user:pw@', 'a:b:c@'])
+            url += rng.choice(hosts)
+            if rng.random() < 0.3:
+                url += f':{rng.randint(1, 65535)}'
+            url += rng.choice(['', '/', '/path/to/page', '/a:b/c'])
+            if rng.random() < 0.5:
+                url += rng.choice(['?id=1', '?next=https://other.com/x', '?a=b:c'])
+            if rng.random() < 0.3:
+                url += rng.choice(['#top', '#/route?x=1'])
+            assert extractor.extract_domain(url) == _reference_extract_domain(url), url